@@ -0,0 +1,140 @@
+'''
+Benchmark of the compute data type used by SDB GUI.
+
+Generates a synthetic multi-band GeoTIFF, then loads the bands, fits a model
+on sampled pixels and predicts the whole scene once per compute data type,
+reporting the runtime and the peak memory allocated by each stage.
+
+Usage:
+    python benchmarks/bench_dtype.py --size 4096 --bands 4 --source-dtype uint16
+'''
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import rasterio as rio
+from rasterio.transform import from_origin
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sdb_core import read_bands
+
+
+def make_image(path, size, nbands, dtype, seed=0):
+    '''
+    Write a synthetic square multi-band GeoTIFF
+    '''
+
+    rng = np.random.default_rng(seed)
+    if np.issubdtype(np.dtype(dtype), np.integer):
+        bands = rng.integers(0, 10000, size=(nbands, size, size)).astype(dtype)
+    else:
+        bands = rng.random((nbands, size, size)).astype(dtype)
+
+    with rio.open(
+        path,
+        'w',
+        driver='GTiff',
+        height=size,
+        width=size,
+        count=nbands,
+        dtype=dtype,
+        crs='EPSG:32748',
+        transform=from_origin(600000, 9400000, 10, 10)
+    ) as dst:
+        dst.write(bands)
+
+
+def measure(func, *args):
+    '''
+    Run func and return its result, runtime (seconds) and peak traced memory (MB)
+    '''
+
+    tracemalloc.start()
+    try:
+        time_start = time.perf_counter()
+        result = func(*args)
+        runtime = time.perf_counter() - time_start
+        peak = tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+    return result, runtime, peak
+
+
+def run(image_path, args):
+    '''
+    Write the synthetic image and benchmark it once per compute data type
+    '''
+
+    make_image(image_path, args.size, args.bands, args.source_dtype)
+
+    print(
+        'Image: %d x %d pixels, %d bands, %s' %
+        (args.size, args.size, args.bands, args.source_dtype)
+    )
+    print('%-10s %-8s %10s %12s' % ('dtype', 'stage', 'time (s)', 'peak (MB)'))
+
+    rng = np.random.default_rng(0)
+
+    for dtype in ['float64', 'float32']:
+        with rio.open(image_path) as image_raw:
+            bands_array, load_time, load_peak = measure(read_bands, image_raw, -999.0, dtype)
+
+        index = rng.choice(bands_array.shape[0], size=args.points, replace=False)
+        features = bands_array[index]
+        z = -(features.sum(axis=1) / features.sum(axis=1).max()) * 30
+
+        if args.method == 'mlr':
+            regressor = LinearRegression()
+        else:
+            regressor = RandomForestRegressor(n_estimators=20, n_jobs=-1, random_state=0)
+
+        _, fit_time, fit_peak = measure(regressor.fit, features, z)
+        z_predict, predict_time, predict_peak = measure(
+            lambda x: regressor.predict(x).astype(dtype, copy=False), bands_array
+        )
+
+        for stage, runtime, peak in [
+            ('load', load_time, load_peak),
+            ('fit', fit_time, fit_peak),
+            ('predict', predict_time, predict_peak)
+        ]:
+            print('%-10s %-8s %10.3f %12.1f' % (dtype, stage, runtime, peak))
+
+        print(
+            '%-10s %-8s %10s %12.1f' %
+            (dtype, 'arrays', '', (bands_array.nbytes + z_predict.nbytes) / 2**20)
+        )
+
+        del bands_array, z_predict
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--size', type=int, default=4096, help='image width and height in pixels')
+    parser.add_argument('--bands', type=int, default=4, help='number of image bands')
+    parser.add_argument('--source-dtype', default='uint16', help='data type of the synthetic image')
+    parser.add_argument('--points', type=int, default=5000, help='number of sampled training pixels')
+    parser.add_argument('--method', choices=['mlr', 'rf'], default='mlr', help='regression method')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='sdb_bench_')
+    image_path = os.path.join(workdir, 'image.tif')
+    try:
+        run(image_path, args)
+    finally:
+        if os.path.exists(image_path):
+            os.remove(image_path)
+        os.rmdir(workdir)
+
+
+if __name__ == '__main__':
+    main()
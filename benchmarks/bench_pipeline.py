@@ -0,0 +1,332 @@
+'''
+Benchmark of every stage of the SDB processing pipeline.
+
+Generates synthetic multi-band GeoTIFFs and depth sample points at the given
+sizes, then loads, reprojects, samples, fits, predicts, validates, median
+filters and saves each scene with each method, printing a table of the
+runtime of every stage (a method that fails is reported as failed and
+left out of the CSV). The table could also be saved as CSV to compare
+runs across versions and machines. Before the table, the import time of
+sdb_core and sdb_gui and of the deferred libraries (warm up) is measured
+in a fresh interpreter.
+
+Usage:
+    python benchmarks/bench_pipeline.py --megapixels 1 16 --points 1000 100000 --methods rf svm
+'''
+
+import argparse
+import csv
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import geopandas as gpd
+import rasterio as rio
+from rasterio.transform import from_origin
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+from sdb_core import (METHOD_OPTION_DICT, default_options, tile_windows, load_sample, process,
+                      dem_blocks, save_dem, remove_prediction)
+
+# Stage of the table for each processing step sent by process()
+STAGE_DICT = {
+    'Reprojecting': 'reproject',
+    'Skip Reproject': 'reproject',
+    'Filtering Out of Bound Points': 'bounds',
+    'Skip Filtering Out of Bound Points': 'bounds',
+    'Point Sampling': 'sample',
+    'Tuning': 'tune',
+    'Fitting': 'fit',
+    'Predicting': 'predict',
+    'Validating': 'validate'
+}
+
+COLUMNS = [
+    'megapixels', 'points', 'method', 'load', 'reproject', 'bounds', 'sample',
+    'tune', 'fit', 'predict', 'validate', 'median', 'save', 'total'
+]
+
+PIXEL_SIZE = 10
+
+# Setup and timed statement of each import measurement
+IMPORT_DICT = {
+    'import sdb_core': ('', 'import sdb_core'),
+    'import sdb_gui': ('', 'import sdb_gui'),
+    'warm up': ('import sdb_core', 'sdb_core.warm_up()')
+}
+
+IMPORT_CODE = '''
+import sys, time
+sys.path.insert(0, %r)
+%s
+time_start = time.perf_counter()
+%s
+print(time.perf_counter() - time_start)
+'''
+
+
+def synthetic_depth(row, col, size):
+    '''
+    Smooth synthetic depth (0 to -30 m) at pixel rows and columns
+    '''
+
+    return -15 * (
+        1 + np.sin(col / size * np.pi * 3) * np.cos(row / size * np.pi * 2)
+    )
+
+
+def make_image(path, size, nbands, tile_size, seed=0):
+    '''
+    Write a synthetic square multi-band GeoTIFF window by window. Band values
+    fall off exponentially with depth at a different rate for each band,
+    like water leaving reflectance, plus noise.
+    '''
+
+    rng = np.random.default_rng(seed)
+    attenuation = np.linspace(0.02, 0.3, nbands)
+
+    with rio.open(
+        path,
+        'w',
+        driver='GTiff',
+        height=size,
+        width=size,
+        count=nbands,
+        dtype='float32',
+        crs='EPSG:32748',
+        transform=from_origin(600000, 9400000, PIXEL_SIZE, PIXEL_SIZE),
+        tiled=True,
+        blockxsize=256,
+        blockysize=256
+    ) as dst:
+        for window in tile_windows(size, size, tile_size):
+            row, col = np.mgrid[
+                window.row_off:window.row_off + window.height,
+                window.col_off:window.col_off + window.width
+            ]
+            z = synthetic_depth(row, col, size)
+            bands = (
+                0.05 + 0.3 * np.exp(attenuation[:, np.newaxis, np.newaxis] * z) +
+                rng.normal(0, 0.005, (nbands, window.height, window.width))
+            )
+            dst.write(bands.astype('float32'), window=window)
+
+
+def make_samples(path, image_path, n_points, crs=None, seed=0):
+    '''
+    Write synthetic depth sample points (depth column 'depth') at random
+    pixel centres of the image, optionally reprojected to crs
+    '''
+
+    rng = np.random.default_rng(seed)
+
+    with rio.open(image_path) as image_raw:
+        size, transform, image_crs = image_raw.width, image_raw.transform, image_raw.crs
+
+    row = rng.integers(0, size, n_points)
+    col = rng.integers(0, size, n_points)
+    x, y = transform * (col + 0.5, row + 0.5)
+    z = synthetic_depth(row, col, size) + rng.normal(0, 0.2, n_points)
+
+    sample_gdf = gpd.GeoDataFrame(
+        {'depth': z},
+        geometry=gpd.points_from_xy(x, y),
+        crs=image_crs
+    )
+    if crs is not None:
+        sample_gdf = sample_gdf.to_crs(crs)
+
+    sample_gdf.to_file(path)
+
+
+def import_time(setup, statement):
+    '''
+    Runtime (seconds) of statement in a fresh interpreter, so modules
+    imported by this script are not counted as already loaded.
+    None if it fails (e.g. PyQt5 is not installed).
+    '''
+
+    completed = subprocess.run(
+        [sys.executable, '-c', IMPORT_CODE % (ROOT_DIR, setup, statement)],
+        capture_output=True,
+        text=True
+    )
+    if completed.returncode != 0:
+        return None
+
+    return float(completed.stdout.split()[-1])
+
+
+def run_case(image_path, sample_path, method, options, output_path, filter_size):
+    '''
+    Run the whole pipeline once and return the runtime (seconds)
+    of every stage
+    '''
+
+    runtime_dict = dict.fromkeys(COLUMNS[3:], 0.0)
+
+    time_start = time.perf_counter()
+    image_raw = rio.open(image_path)
+    sample_raw = load_sample(sample_path)
+    runtime_dict['load'] = time.perf_counter() - time_start
+
+    inputs = {
+        'depth_label': 'depth',
+        'train_size': 0.75,
+        'limit_state': False,
+        'limit_a': 0.0,
+        'limit_b': -30.0,
+        'method': method
+    }
+
+    try:
+        result = process(image_raw, sample_raw, inputs, options, lambda text: None)
+
+        try:
+            for stage in result['profile']['stages']:
+                runtime_dict[STAGE_DICT[stage['stage']]] += stage['wall_time_s']
+
+            proc_op_dict = options['proc']
+
+            # Median filter alone, without writing
+            time_start = time.perf_counter()
+            windows = tile_windows(image_raw.height, image_raw.width, proc_op_dict['tile_size'])
+            for _ in dem_blocks(
+                result, image_raw, 'float32', filter_size, windows, proc_op_dict['n_jobs']
+            ):
+                pass
+            runtime_dict['median'] = time.perf_counter() - time_start
+
+            # Writing alone, without filter
+            time_start = time.perf_counter()
+            save_dem(
+                result=result,
+                image_raw=image_raw,
+                save_path=output_path,
+                driver='GTiff',
+                dtype='float32',
+                filter_size=None,
+                tile_size=proc_op_dict['tile_size'],
+                tiff_options={'profile': 'Tiled DEFLATE'},
+                n_jobs=proc_op_dict['n_jobs']
+            )
+            runtime_dict['save'] = time.perf_counter() - time_start
+        finally:
+            remove_prediction(result)
+    finally:
+        image_raw.close()
+
+    runtime_dict['total'] = sum(runtime_dict.values())
+
+    return runtime_dict
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        '--megapixels', type=float, nargs='+', default=[1.0],
+        help='image sizes in megapixels (square images, e.g. 1 16 256 1000)'
+    )
+    parser.add_argument(
+        '--points', type=int, nargs='+', default=[1000],
+        help='numbers of depth sample points (e.g. 1000 100000 1000000)'
+    )
+    method_dict = {short: method for method, short in METHOD_OPTION_DICT.items()}
+    parser.add_argument(
+        '--methods', nargs='+', default=list(method_dict),
+        choices=list(method_dict), help='regression methods'
+    )
+    parser.add_argument('--bands', type=int, default=4, help='number of image bands')
+    parser.add_argument(
+        '--sample-crs', default=None,
+        help='CRS of the depth samples (e.g. EPSG:4326 to benchmark reprojecting)'
+    )
+    parser.add_argument('--tile-size', type=int, default=1024, help='tile size in pixels')
+    parser.add_argument('--n-jobs', type=int, default=-2, help='processing cores')
+    parser.add_argument('--median-filter', type=int, default=3, help='median filter size')
+    parser.add_argument('--repeat', type=int, default=1, help='runs of each case (fastest is kept)')
+    parser.add_argument(
+        '--options', default=None,
+        help='JSON file of processing options and method hyperparameters, '
+        'using the same keys as the options of sdb_cli.py config'
+    )
+    parser.add_argument('--csv', default=None, help='save the table into this CSV file')
+    parser.add_argument('--seed', type=int, default=0, help='random seed of synthetic data')
+    args = parser.parse_args()
+
+    options = default_options()
+    if args.options is not None:
+        with open(args.options) as options_file:
+            for group, op_dict in json.load(options_file).items():
+                options[group].update(op_dict)
+    options['proc']['tile_size'] = args.tile_size
+    options['proc']['n_jobs'] = args.n_jobs
+    options['proc']['model_cache'] = False
+
+    for name, (setup, statement) in IMPORT_DICT.items():
+        runtime = import_time(setup, statement)
+        print('%-16s %s' % (name, 'failed' if runtime is None else '%.3f s' % runtime))
+    print()
+
+    workdir = tempfile.mkdtemp(prefix='sdb_bench_')
+    rows = []
+
+    print(' '.join('%-10s' % column[:10] for column in COLUMNS))
+
+    try:
+        for megapixels in args.megapixels:
+            size = int(np.sqrt(megapixels * 1e6))
+            image_path = os.path.join(workdir, 'image.tif')
+            make_image(image_path, size, args.bands, args.tile_size, args.seed)
+
+            for n_points in args.points:
+                sample_path = os.path.join(workdir, 'sample.shp')
+                make_samples(sample_path, image_path, n_points, args.sample_crs, args.seed)
+
+                for short_method in args.methods:
+                    method = method_dict[short_method]
+                    try:
+                        runs = [
+                            run_case(
+                                image_path, sample_path, method, options,
+                                os.path.join(workdir, 'depth.tif'), args.median_filter
+                            )
+                            for _ in range(args.repeat)
+                        ]
+                    except Exception as error:
+                        # e.g. options not supported by the installed scikit-learn,
+                        # the other methods are still benchmarked
+                        print(
+                            '%-10s %-10s %-10s ' % (megapixels, n_points, short_method) +
+                            'failed: ' + type(error).__name__ + ': ' + str(error)
+                        )
+                        continue
+                    runtime_dict = min(runs, key=lambda run: run['total'])
+
+                    row = {'megapixels': megapixels, 'points': n_points, 'method': method}
+                    row.update({stage: round(runtime, 4) for stage, runtime in runtime_dict.items()})
+                    rows.append(row)
+
+                    print(
+                        '%-10s %-10s %-10s ' % (megapixels, n_points, short_method) +
+                        ' '.join('%-10.3f' % row[column] for column in COLUMNS[3:])
+                    )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.csv is not None:
+        with open(args.csv, 'w', newline='') as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,484 @@
+'''
+Command line (headless) entry point of SDB GUI.
+
+Runs the same processing as SDB GUI (reproject, filter, sample, fit,
+predict, validate and save) without PyQt5, either for one image and depth
+sample pair or for every pair found in a directory, using a JSON config file.
+Scenes of a batch could be spread over a pool of worker processes.
+With a saved model in config, images are predicted without depth sample.
+
+Usage:
+    python sdb_cli.py config.json [--workers N]
+'''
+###############################################################################
+################################# Main Imports ################################
+
+import argparse
+import copy
+import datetime
+import json
+import os
+import queue
+import sys
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from glob import glob
+from multiprocessing import Manager
+import rasterio as rio
+from sdb_core import (PREDICT_ONLY_STEP, default_options, process_steps, budget_tile_size,
+                      load_sample, process, predict_only, result_info, predict_only_info,
+                      model_metadata, save_outputs, remove_prediction)
+
+###############################################################################
+###############################################################################
+
+EXTENSION_DICT = {
+    'GTiff': '.tif',
+    'HFA': '.img',
+    'XYZ': '.xyz',
+    'BAG': '.bag'
+}
+
+
+def default_config():
+    '''
+    Default batch config. Keys of inputs are the same as in SDB GUI,
+    'options' holds processing options and method hyperparameters.
+    'model' is the location of a saved model to predict images without
+    depth sample, 'save_model' saves the fitted model next to each DEM.
+    '''
+
+    return {
+        'image': None,
+        'sample': None,
+        'output': None,
+        'input_dir': None,
+        'image_pattern': '*.tif',
+        'sample_pattern': '{stem}.shp',
+        'output_dir': None,
+        'depth_label': None,
+        'method': 'Random Forest',
+        'train_size': 0.75,
+        'limit_state': False,
+        'limit_a': 0.0,
+        'limit_b': -30.0,
+        'median_filter': 3,
+        'format': 'GTiff',
+        'output_dtype': 'float32',
+        'tiff_profile': 'Tiled DEFLATE',
+        'overviews': False,
+        'xyz_drop_nan': True,
+        'xyz_precision': 3,
+        'xyz_gzip': False,
+        'train_test_format': None,
+        'report': True,
+        'workers': 1,
+        'memory_budget': None,
+        'model': None,
+        'save_model': False,
+        'options': default_options()
+    }
+
+
+def merge_options(op_dict, user_op_dict):
+    '''
+    Merging user options into default options in place. Dictionaries of
+    dictionaries (e.g. the tuning grid of every method) are merged key by
+    key, so setting the grid of one method keeps the grids of the others,
+    which are replaced as a whole.
+    '''
+
+    for key, value in user_op_dict.items():
+        default = op_dict.get(key)
+        if (
+            isinstance(value, dict) and isinstance(default, dict) and
+            all(isinstance(sub_value, dict) for sub_value in default.values())
+        ):
+            merge_options(default, value)
+        else:
+            op_dict[key] = value
+
+
+def load_config(config_path):
+    '''
+    Loading JSON config file on top of the default config
+    '''
+
+    with open(config_path) as config_file:
+        user_config = json.load(config_file)
+
+    config = default_config()
+    for group, op_dict in user_config.pop('options', {}).items():
+        if group not in config['options']:
+            raise ValueError(
+                'Unknown options group ' + group + ' in config file! Please use ' +
+                ', '.join(config['options']) + '.'
+            )
+        merge_options(config['options'][group], op_dict)
+    config.update(user_config)
+
+    if config['depth_label'] is None and config['model'] is None:
+        raise ValueError('Please set depth_label in config file!')
+    if config['image'] is not None and config['sample'] is None and config['model'] is None:
+        raise ValueError('Please set sample (or model) for image in config file!')
+    if config['output_dtype'] not in ['float32', 'float64']:
+        raise ValueError(
+            'Unknown output_dtype ' + str(config['output_dtype']) +
+            ' in config file! Please use float32 or float64.'
+        )
+    if config['limit_a'] < config['limit_b']:
+        config['limit_a'], config['limit_b'] = config['limit_b'], config['limit_a']
+
+    return config
+
+
+def scene_pairs(config):
+    '''
+    Listing image, depth sample and output location of every scene to process.
+    Images without a matching depth sample in input_dir are skipped, unless
+    they are predicted using a saved model.
+    '''
+
+    extension = EXTENSION_DICT[config['format']]
+
+    if config['image'] is not None:
+        output = config['output']
+        if output is None:
+            output = os.path.splitext(config['image'])[0] + '_depth' + extension
+        return [(config['image'], config['sample'], output)]
+
+    pairs = []
+    output_dir = config['output_dir'] or config['input_dir']
+
+    for image_path in sorted(glob(os.path.join(config['input_dir'], config['image_pattern']))):
+        stem = os.path.splitext(os.path.basename(image_path))[0]
+        sample_path = os.path.join(
+            config['input_dir'], config['sample_pattern'].format(stem=stem)
+        )
+
+        if config['model'] is not None:
+            sample_path = None
+        elif not os.path.exists(sample_path):
+            print('Skip ' + image_path + ': no depth sample ' + sample_path)
+            continue
+
+        pairs.append((image_path, sample_path, os.path.join(output_dir, stem + '_depth' + extension)))
+
+    return pairs
+
+
+def dem_options(config, options):
+    '''
+    DEM output options of config for save_dem
+    '''
+
+    return {
+        'driver': config['format'],
+        'dtype': config['output_dtype'],
+        'filter_size': config['median_filter'],
+        'tile_size': options['proc']['tile_size'],
+        'xyz_options': {
+            'drop_nan': config['xyz_drop_nan'],
+            'precision': config['xyz_precision'],
+            'compress': config['xyz_gzip']
+        },
+        'tiff_options': {
+            'profile': config['tiff_profile'],
+            'overviews': config['overviews']
+        },
+        'n_jobs': options['proc']['n_jobs']
+    }
+
+
+def run_scene(image_path, sample_path, output_path, config, callback=None):
+    '''
+    Processing one image and depth sample pair and saving its DEM,
+    training and testing data, model and report according to config.
+    callback receives the text of each processing step as it starts.
+    '''
+
+    if config['model'] is not None:
+        return predict_scene(image_path, output_path, config, callback)
+
+    time_list = []
+
+    def time_step(text):
+        time_list.append(datetime.datetime.now())
+        if callback is not None:
+            callback(text)
+
+    inputs = {
+        'depth_label': config['depth_label'],
+        'train_size': config['train_size'],
+        'limit_state': config['limit_state'],
+        'limit_a': config['limit_a'],
+        'limit_b': config['limit_b'],
+        'method': config['method']
+    }
+    options = config['options']
+
+    output_dir = os.path.dirname(output_path)
+    if output_dir != '':
+        os.makedirs(output_dir, exist_ok=True)
+
+    with rio.open(image_path) as image_raw:
+        # Only points in the image footprint are read when the others
+        # would be filtered out anyway
+        sample_raw = load_sample(
+            sample_path,
+            [inputs['depth_label']],
+            image_raw if options['proc']['exclude_outside'] == True else None
+        )
+        from pandas.api.types import is_float_dtype
+
+        # float32 depth (e.g. from GeoPackage or Parquet) is as good as float64
+        if is_float_dtype(sample_raw[inputs['depth_label']]) == False:
+            raise ValueError('Depth header ' + inputs['depth_label'] + ' is not float type!')
+
+        if config['memory_budget'] is not None:
+            options = copy.deepcopy(options)
+            options['proc']['tile_size'] = budget_tile_size(
+                config['memory_budget'],
+                image_raw.count,
+                options['proc']['compute_dtype']
+            )
+
+        result = process(image_raw, sample_raw, inputs, options, time_step)
+
+        try:
+            print_result_info = result_info(
+                image_path, sample_path, image_raw, sample_raw,
+                inputs, options, result, time_list
+            )
+
+            if config['save_model'] == True:
+                metadata = model_metadata(image_raw, inputs, options, result)
+            else:
+                metadata = None
+
+            save_outputs(
+                result=result,
+                image_raw=image_raw,
+                save_path=output_path,
+                dem_options=dem_options(config, options),
+                train_test_format=config['train_test_format'],
+                metadata=metadata,
+                report_text=print_result_info if config['report'] == True else None
+            )
+        finally:
+            remove_prediction(result)
+
+    return {
+        'image': image_path,
+        'sample': sample_path,
+        'output': output_path,
+        'rmse': result['rmse'],
+        'mae': result['mae'],
+        'r2': result['r2']
+    }
+
+
+def predict_scene(image_path, output_path, config, callback=None):
+    '''
+    Predicting one image using the saved model of config and saving
+    its DEM and report according to config.
+    callback receives the text of each processing step as it starts.
+    '''
+
+    time_list = []
+
+    def time_step(text):
+        time_list.append(datetime.datetime.now())
+        if callback is not None:
+            callback(text)
+
+    options = config['options']
+
+    output_dir = os.path.dirname(output_path)
+    if output_dir != '':
+        os.makedirs(output_dir, exist_ok=True)
+
+    with rio.open(image_path) as image_raw:
+        if config['memory_budget'] is not None:
+            options = copy.deepcopy(options)
+            options['proc']['tile_size'] = budget_tile_size(
+                config['memory_budget'],
+                image_raw.count,
+                options['proc']['compute_dtype']
+            )
+
+        result = predict_only(image_raw, config['model'], options, time_step)
+
+        try:
+            print_result_info = predict_only_info(
+                image_path, config['model'], image_raw, options, result, time_list
+            )
+
+            save_outputs(
+                result=result,
+                image_raw=image_raw,
+                save_path=output_path,
+                dem_options=dem_options(config, options),
+                report_text=print_result_info if config['report'] == True else None
+            )
+        finally:
+            remove_prediction(result)
+
+    metadata = result['model_metadata']
+
+    return {
+        'image': image_path,
+        'sample': None,
+        'output': output_path,
+        'rmse': metadata['rmse'],
+        'mae': metadata['mae'],
+        'r2': metadata['r2']
+    }
+
+
+def worker_config(config, workers):
+    '''
+    Config of one batch worker. Processing cores given relative to all cores
+    (negative n_jobs) are shared between workers so they don't oversubscribe
+    the machine.
+    '''
+
+    config = copy.deepcopy(config)
+    proc_op_dict = config['options']['proc']
+
+    if workers > 1 and proc_op_dict['n_jobs'] < 0:
+        all_cores = os.cpu_count() + 1 + proc_op_dict['n_jobs']
+        proc_op_dict['n_jobs'] = max(1, all_cores // workers)
+
+    return config
+
+
+def scene_job(image_path, sample_path, output_path, config, progress=None):
+    '''
+    Processing one scene of a batch. A failing scene is returned as a summary
+    with its error instead of raised, so the rest of the batch keeps running.
+    progress receives [time, text] of each processing step, like time_signal
+    of SDB GUI.
+    '''
+
+    scene_name = os.path.basename(image_path)
+
+    def callback(text):
+        if progress is not None:
+            progress([datetime.datetime.now(), scene_name + ': ' + text])
+
+    try:
+        return run_scene(image_path, sample_path, output_path, config, callback)
+    except Exception as error:
+        return {
+            'image': image_path,
+            'sample': sample_path,
+            'output': None,
+            'error': repr(error)
+        }
+
+
+def batch_steps(config):
+    '''
+    Number of progress steps a batch sends to callback of run_batch
+    (e.g. maximum of a progress bar)
+    '''
+
+    if config['model'] is not None:
+        return len(scene_pairs(config)) * PREDICT_ONLY_STEP
+
+    return len(scene_pairs(config)) * process_steps(config['options'])
+
+
+def run_batch(config, callback=None):
+    '''
+    Processing every scene of config. With more than one worker, scenes are
+    spread over a pool of worker processes. callback receives [time, text]
+    of every processing step of every scene (batch_steps in total).
+    Returns the summaries in the same order as the scenes.
+    '''
+
+    pairs = scene_pairs(config)
+    workers = max(1, min(config['workers'], len(pairs)))
+    job_config = worker_config(config, workers)
+
+    if workers == 1:
+        return [
+            scene_job(image_path, sample_path, output_path, job_config, callback)
+            for image_path, sample_path, output_path in pairs
+        ]
+
+    with Manager() as manager:
+        progress_queue = manager.Queue()
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    scene_job,
+                    image_path,
+                    sample_path,
+                    output_path,
+                    job_config,
+                    progress_queue.put
+                )
+                for image_path, sample_path, output_path in pairs
+            ]
+
+            pending = set(futures)
+            while len(pending) > 0:
+                _, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+
+                # Forward progress of the workers
+                while True:
+                    try:
+                        time_text = progress_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if callback is not None:
+                        callback(time_text)
+
+        return [future.result() for future in futures]
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+        description='Run SDB processing without GUI using a JSON config file.'
+    )
+    parser.add_argument('config', help='location of JSON config file')
+    parser.add_argument(
+        '--workers', type=int,
+        help='number of scenes processed at the same time (overrides config)'
+    )
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    if args.workers is not None:
+        config['workers'] = args.workers
+
+    steps = batch_steps(config)
+    step_count = [0]
+
+    def progress(time_text):
+        step_count[0] += 1
+        print('[' + str(step_count[0]) + '/' + str(steps) + '] ' + time_text[1].strip())
+
+    summaries = run_batch(config, progress)
+
+    failed = 0
+    for summary in summaries:
+        if 'error' in summary:
+            failed += 1
+            print('FAILED\t' + summary['image'] + '\t' + summary['error'])
+        else:
+            print(
+                'DONE\t' + summary['output'] +
+                '\tRMSE ' + str(summary['rmse']) +
+                '\tMAE ' + str(summary['mae']) +
+                '\tR2 ' + str(summary['r2'])
+            )
+
+    return 1 if failed > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,3046 @@
+'''
+MIT License
+
+Copyright (c) 2020-present Rifqi Muhammad Harrys
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+'''
+###############################################################################
+################################# Main Imports ################################
+
+from joblib import parallel_backend
+from numpy.lib.stride_tricks import sliding_window_view
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+import joblib
+import numpy as np
+import rasterio as rio
+import rasterio.shutil
+from rasterio.enums import Resampling
+from rasterio.errors import RasterioIOError
+from rasterio.features import geometry_mask
+from rasterio.vrt import WarpedVRT
+from rasterio.warp import transform_bounds
+from rasterio.windows import Window
+from glob import glob
+from pathlib import Path
+import datetime
+import gzip
+import hashlib
+import importlib.util
+import json
+import os
+import platform
+import tempfile
+import threading
+import time
+import warnings
+
+# scikit-learn, SciPy, pandas and GeoPandas take seconds to import, so they
+# are imported on first use (or in the background by warm_up) to let
+# SDB GUI show its window right away.
+
+# Optional, used to measure memory of the processing steps on any platform
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+###############################################################################
+###############################################################################
+
+# Processing core of SDB GUI. Everything here works without PyQt5, so the
+# same pipeline is shared by the GUI (sdb_gui.py) and the command line
+# batch entry point (sdb_cli.py).
+
+SDB_GUI_VERSION = '3.3.1'
+
+VAL_IF_NAN = -999.0
+
+# Number of processing steps sent to callback by process() and predict_only()
+# (process_steps() adds the tuning step)
+PROGRESS_STEP = 7
+PREDICT_ONLY_STEP = 3
+
+# Report name of each hyperparameter search
+TUNE_SEARCH_DICT = {
+    'grid': 'Grid Search',
+    'random': 'Random Search',
+    'halving': 'Successive Halving'
+}
+
+# Smallest number of training points of a successive halving round
+HALVING_MIN_SAMPLES = 100
+
+# Early stopping of Histogram Gradient Boosting by its option name
+EARLY_STOPPING_DICT = {
+    'Auto': 'auto',
+    'Enabled': True,
+    'Disabled': False
+}
+
+# Report name of each kernel approximation and linear solver of SVM (approximate)
+APPROXIMATION_DICT = {
+    'nystroem': 'Nystroem',
+    'rff': 'Random Fourier Features'
+}
+
+SOLVER_DICT = {
+    'linear_svr': 'Linear SVR',
+    'ridge': 'Ridge'
+}
+
+# Inputs of a processing run, besides the options
+INPUT_KEYS = ['depth_label', 'train_size', 'limit_state', 'limit_a', 'limit_b', 'method']
+
+# Processing options which change sampled data or fitted model
+CACHE_PROC_KEYS = [
+    'random_state', 'auto_negative', 'exclude_outside', 'compute_dtype', 'split', 'block_size',
+    'thinning', 'count_weights', 'max_points', 'cap_size'
+]
+
+# GeoTIFF creation options of each DEM output profile. Predictor 3 is the
+# floating point predictor. 'cog' profiles are copied into Cloud Optimized
+# GeoTIFF layout after writing.
+TIFF_PROFILE_DICT = {
+    'Uncompressed': {},
+    'Tiled DEFLATE': {
+        'tiled': True, 'blockxsize': 512, 'blockysize': 512,
+        'compress': 'deflate', 'predictor': 3, 'nodata': np.nan
+    },
+    'Tiled ZSTD': {
+        'tiled': True, 'blockxsize': 512, 'blockysize': 512,
+        'compress': 'zstd', 'predictor': 3, 'nodata': np.nan
+    },
+    'Tiled LZW': {
+        'tiled': True, 'blockxsize': 512, 'blockysize': 512,
+        'compress': 'lzw', 'predictor': 3, 'nodata': np.nan
+    },
+    'Cloud Optimized GeoTIFF': {
+        'tiled': True, 'blockxsize': 512, 'blockysize': 512,
+        'compress': 'deflate', 'predictor': 3, 'nodata': np.nan, 'cog': True
+    }
+}
+
+# Depth sample files read by pandas (CSV and XYZ point files) and by
+# pyarrow (GeoParquet). Every other file is read by GeoPandas.
+POINT_TABLE_EXTENSIONS = ['.csv', '.txt', '.xyz']
+PARQUET_EXTENSIONS = ['.parquet', '.geoparquet']
+
+# Column names (lower case) taken as point coordinates of CSV and XYZ files
+X_NAMES = ['x', 'lon', 'long', 'longitude', 'easting', 'east']
+Y_NAMES = ['y', 'lat', 'latitude', 'northing', 'north']
+
+# Rows of a CSV or XYZ file read at once when filtering points by image bounds
+POINT_TABLE_CHUNK = 1000000
+
+
+class Cancelled(Exception):
+    '''
+    Raised at a checkpoint of a running job cancelled by the user
+    '''
+
+
+class JobControl:
+    '''
+    Cancel and pause state of a running job, shared between the thread
+    controlling the job and the thread running it
+    '''
+
+    def __init__(self):
+
+        self.cancel_event = threading.Event()
+        self.resume_event = threading.Event()
+        self.resume_event.set()
+
+
+    def cancel(self):
+
+        self.cancel_event.set()
+        self.resume_event.set()
+
+
+    def pause(self):
+
+        self.resume_event.clear()
+
+
+    def resume(self):
+
+        self.resume_event.set()
+
+
+    def paused(self):
+
+        return not self.resume_event.is_set()
+
+
+    def checkpoint(self):
+        '''
+        Waiting here while the job is paused and raising Cancelled
+        when it is cancelled
+        '''
+
+        self.resume_event.wait()
+        if self.cancel_event.is_set():
+            raise Cancelled('Cancelled by user')
+
+
+def current_rss():
+    '''
+    Resident memory of this process in bytes (None when unknown)
+    '''
+
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def to_mb(n_bytes):
+    '''
+    Bytes to megabytes rounded to 3 decimals (None stays None)
+    '''
+
+    if n_bytes is None:
+        return None
+
+    return round(n_bytes / 2**20, 3)
+
+
+class Profiler:
+    '''
+    Recording wall time, CPU time and peak resident memory of every
+    processing step, as the step texts are sent through step() to
+    callback. Memory is sampled on a background thread every
+    interval seconds.
+    '''
+
+    def __init__(self, callback, interval=0.05):
+
+        self.callback = callback
+        self.interval = interval
+        self.stages = []
+        self.current = None
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.sampler = threading.Thread(target=self.sample, daemon=True)
+        self.sampler.start()
+
+
+    def sample(self):
+
+        while not self.stop_event.wait(self.interval):
+            rss = current_rss()
+            with self.lock:
+                if self.current is not None and rss is not None:
+                    self.current['peak_rss'] = max(self.current['peak_rss'], rss)
+
+
+    def end_stage(self):
+
+        rss = current_rss()
+        with self.lock:
+            if self.current is None:
+                return
+            stage = self.current
+            self.current = None
+
+        if rss is not None:
+            stage['peak_rss'] = max(stage['peak_rss'], rss)
+
+        self.stages.append({
+            'stage': stage['stage'],
+            'wall_time_s': round(time.perf_counter() - stage['wall'], 6),
+            'cpu_time_s': round(time.process_time() - stage['cpu'], 6),
+            'start_rss_mb': to_mb(stage['start_rss']),
+            'peak_rss_mb': to_mb(stage['peak_rss']) if rss is not None else None
+        })
+
+
+    def step(self, text):
+        '''
+        Ending the running step and starting the step of text
+        ('Done.' starts nothing), then sending text to callback
+        '''
+
+        self.end_stage()
+
+        name = text.strip().rstrip('.')
+        if name != 'Done':
+            rss = current_rss()
+            with self.lock:
+                self.current = {
+                    'stage': name,
+                    'wall': time.perf_counter(),
+                    'cpu': time.process_time(),
+                    'start_rss': rss,
+                    'peak_rss': rss or 0
+                }
+
+        self.callback(text)
+
+
+    def close(self):
+
+        self.end_stage()
+        self.stop_event.set()
+        self.sampler.join()
+
+
+def check_cancel(cancel):
+    '''
+    Checkpoint of a cancellable job. cancel is a JobControl
+    (or None when the job can't be cancelled or paused).
+    '''
+
+    if cancel is not None:
+        cancel.checkpoint()
+
+
+def warm_up():
+    '''
+    Importing the libraries deferred until first use, e.g. in a background
+    thread after the GUI is shown, so the first processing doesn't wait
+    for them
+    '''
+
+    import geopandas
+    import pandas
+    import scipy.ndimage
+    import sklearn.ensemble
+    import sklearn.kernel_approximation
+    import sklearn.linear_model
+    import sklearn.metrics
+    import sklearn.model_selection
+    import sklearn.neighbors
+    import sklearn.svm
+
+
+def default_options():
+    '''
+    Default processing options and hyperparameters of each method
+    '''
+
+    return {
+        'proc': {
+            'backend': 'threading',
+            'n_jobs': -2,
+            'random_state': 0,
+            'split': 'random',
+            'block_size': 100.0,
+            'thinning': 'none',
+            'count_weights': False,
+            'max_points': 0,
+            'cap_size': 100.0,
+            'auto_negative': True,
+            'exclude_outside': True,
+            'tiled_predict': True,
+            'tile_size': 1024,
+            'compute_dtype': 'float32',
+            'water_mask': 'none',
+            'mask_band_a': 2,
+            'mask_band_b': 4,
+            'mask_threshold': 0.0,
+            'mask_path': None,
+            'model_cache': False,
+            'cache_dir': os.path.join(str(Path.home()), '.sdb_gui', 'model_cache'),
+            'cache_size': 2048
+        },
+        'knn': {
+            'n_neighbors': 5,
+            'weights': 'distance',
+            'algorithm': 'auto',
+            'leaf_size': 30
+        },
+        'mlr': {
+            'fit_intercept': True,
+            'normalize': False,
+            'copy_x': True
+        },
+        'rf': {
+            'n_estimators': 300,
+            'criterion': 'mse',
+            'bootstrap': True,
+            'random_state': 0
+        },
+        'svm': {
+            'kernel': 'rbf',
+            'gamma': .1,
+            'c': 1000.0,
+            'degree': 3
+        },
+        'svma': {
+            'approximation': 'nystroem',
+            'gamma': .1,
+            'n_components': 500,
+            'solver': 'linear_svr',
+            'c': 1000.0,
+            'batch_size': 100000
+        },
+        'hgb': {
+            'learning_rate': .1,
+            'max_iter': 300,
+            'max_leaf_nodes': 31,
+            'min_samples_leaf': 20,
+            'l2_regularization': 0.0,
+            'early_stopping': 'auto',
+            'validation_fraction': .1,
+            'n_iter_no_change': 10,
+            'missing_values': True,
+            'random_state': 0
+        },
+        'tune': {
+            'search': 'none',
+            'cv': 'kfold',
+            'folds': 5,
+            'n_iter': 20,
+            'factor': 3,
+            'cache': True,
+            'grid': {
+                'knn': {
+                    'n_neighbors': [3, 5, 10, 20],
+                    'weights': ['uniform', 'distance']
+                },
+                'mlr': {
+                    'fit_intercept': [True, False]
+                },
+                'rf': {
+                    'n_estimators': [100, 300],
+                    'max_features': [1.0, 0.5],
+                    'min_samples_leaf': [1, 5]
+                },
+                'svm': {
+                    'C': [1.0, 10.0, 100.0, 1000.0],
+                    'gamma': [0.01, 0.1, 1.0]
+                },
+                'svma': {
+                    'features__gamma': [0.01, 0.1, 1.0],
+                    'features__n_components': [500, 2000]
+                },
+                'hgb': {
+                    'learning_rate': [0.05, 0.1, 0.2],
+                    'max_leaf_nodes': [15, 31, 63],
+                    'min_samples_leaf': [5, 20]
+                }
+            }
+        }
+    }
+
+
+def tile_windows(height, width, tile_size):
+    '''
+    Generate rasterio windows covering a raster of the given size in
+    square tiles of tile_size pixels. Edge tiles are clipped to the raster.
+    '''
+
+    for row_off in range(0, height, tile_size):
+        for col_off in range(0, width, tile_size):
+            yield Window(
+                col_off,
+                row_off,
+                min(tile_size, width - col_off),
+                min(tile_size, height - row_off)
+            )
+
+
+def row_windows(height, width, tile_size):
+    '''
+    Generate rasterio windows covering a raster of the given size in
+    blocks of full rows, holding about as many pixels as a square tile
+    of tile_size pixels
+    '''
+
+    block_rows = max(1, tile_size * tile_size // width)
+
+    for row_off in range(0, height, block_rows):
+        yield Window(0, row_off, width, min(block_rows, height - row_off))
+
+
+def budget_tile_size(memory_budget, nbands, dtype):
+    '''
+    Largest tile size (multiple of 64 pixels) whose band array, its float64
+    copy made by some regressors and the predicted values fit into
+    memory_budget MB
+    '''
+
+    bytes_per_pixel = nbands * (np.dtype(dtype).itemsize + 8) + 2 * 8
+    pixels = memory_budget * 2**20 / bytes_per_pixel
+
+    return max(64, int(np.sqrt(pixels)) // 64 * 64)
+
+
+def read_bands(raster, nan_value, dtype, window=None):
+    '''
+    Read all bands of an opened raster (or only a window of it) straight
+    into a pixel by band array of the given float dtype and change missing
+    values (if any) to nan_value. The bands are only read from disk when
+    this is called.
+    '''
+
+    bands = raster.read(window=window, out_dtype=dtype)
+    bands_array = bands.reshape(bands.shape[0], -1).T
+    bands_array[np.isnan(bands_array)] = nan_value
+
+    return bands_array
+
+
+def sample_bands(raster, row, col, dtype, tile_size):
+    '''
+    Sample all bands of an opened raster at the given pixel rows and columns.
+    Only the tiles of tile_size pixels which contain sample points are read
+    from disk, each of them once.
+    '''
+
+    if (
+        (row < 0).any() or (row >= raster.height).any() or
+        (col < 0).any() or (col >= raster.width).any()
+    ):
+        raise IndexError('Sample points are out of image boundary')
+
+    samples = np.empty((row.size, raster.count), dtype=dtype)
+
+    # Group sample points by the tile they fall in
+    tile_row, tile_col = row // tile_size, col // tile_size
+    tile_id = tile_row * (raster.width // tile_size + 1) + tile_col
+    order = np.argsort(tile_id, kind='stable')
+    starts = np.flatnonzero(np.diff(tile_id[order], prepend=-1))
+    ends = np.append(starts[1:], order.size)
+
+    for start, end in zip(starts, ends):
+        index = order[start:end]
+        row_off = tile_row[index[0]] * tile_size
+        col_off = tile_col[index[0]] * tile_size
+        window = Window(
+            col_off,
+            row_off,
+            min(tile_size, raster.width - col_off),
+            min(tile_size, raster.height - row_off)
+        )
+
+        tile = raster.read(window=window, out_dtype=dtype)
+        samples[index] = tile[:, row[index] - row_off, col[index] - col_off].T
+
+    return samples
+
+
+def is_number(text):
+    '''
+    Whether text could be read as a number
+    '''
+
+    try:
+        float(text)
+    except ValueError:
+        return False
+
+    return True
+
+
+def image_footprint(image_raw, crs):
+    '''
+    Bounds (left, bottom, right, top) of the image transformed into crs,
+    or in the image CRS if crs is None. Edges are densified, so the bounds
+    cover the whole image in any projection.
+    '''
+
+    if crs is None or str(crs).upper() == str(image_raw.crs).upper():
+        return tuple(image_raw.bounds)
+
+    return transform_bounds(image_raw.crs, crs, *image_raw.bounds, densify_pts=21)
+
+
+def point_table_layout(sample_path):
+    '''
+    Separator, header row (None or 0) and column names of a CSV or XYZ
+    point file, from its first line
+    '''
+
+    with open(sample_path) as sample_file:
+        first_line = sample_file.readline().strip()
+
+    sep = None
+    for separator in [',', ';', '\t']:
+        if separator in first_line:
+            sep = separator
+            break
+
+    if sep is None:
+        sep = r'\s+'
+        fields = first_line.split()
+    else:
+        fields = [field.strip().strip('"') for field in first_line.split(sep)]
+
+    if all(is_number(field) for field in fields):
+        header = None
+        names = ['x', 'y', 'z'] + ['field_' + str(i) for i in range(4, len(fields) + 1)]
+        names = names[:len(fields)]
+    else:
+        header = 0
+        names = fields
+
+    return sep, header, names
+
+
+def read_point_table(sample_path, columns=None, rows=None, image_raw=None):
+    '''
+    Reading a CSV or XYZ point file (comma, semicolon, tab or space
+    separated) into points. Coordinates are taken from columns named like
+    X_NAMES and Y_NAMES, or from the first two columns of a file without
+    header (x, y, z). The file has no CRS, its points are taken to be in
+    the image CRS. With image_raw, the file is read in chunks and only
+    points inside the image bounds are kept.
+    '''
+
+    import geopandas as gpd
+    import pandas as pd
+
+    sep, header, names = point_table_layout(sample_path)
+
+    x_name = next((name for name in names if name.lower() in X_NAMES), None)
+    y_name = next((name for name in names if name.lower() in Y_NAMES), None)
+    if x_name is None or y_name is None:
+        raise ValueError(
+            'No coordinate columns found. Please name them x and y (or ' +
+            ', '.join(X_NAMES[1:]) + ' and ' + ', '.join(Y_NAMES[1:]) + ')!'
+        )
+
+    if columns is None:
+        usecols = names
+    else:
+        usecols = [x_name, y_name] + [name for name in columns if name not in [x_name, y_name]]
+
+    read_kwargs = {
+        'sep': sep,
+        'header': header,
+        'names': names,
+        'usecols': usecols,
+        'nrows': rows
+    }
+
+    if image_raw is None:
+        point_df = pd.read_csv(sample_path, **read_kwargs)
+    else:
+        left, bottom, right, top = image_footprint(image_raw, None)
+
+        chunks = []
+        with pd.read_csv(sample_path, chunksize=POINT_TABLE_CHUNK, **read_kwargs) as reader:
+            for chunk in reader:
+                chunks.append(chunk[
+                    chunk[x_name].between(left, right) & chunk[y_name].between(bottom, top)
+                ])
+        point_df = pd.concat(chunks, ignore_index=True)
+
+    return gpd.GeoDataFrame(
+        point_df.drop(columns=[x_name, y_name]),
+        geometry=gpd.points_from_xy(point_df[x_name], point_df[y_name]),
+        crs=None
+    )
+
+
+def read_parquet_sample(sample_path, columns=None, rows=None, image_raw=None):
+    '''
+    Reading a GeoParquet file, only its geometry and the given columns,
+    and only points inside the image footprint with image_raw.
+    Needs pyarrow.
+    '''
+
+    import geopandas as gpd
+
+    if columns is not None:
+        import pyarrow.parquet as pq
+
+        geo_metadata = json.loads(pq.read_schema(sample_path).metadata[b'geo'])
+        columns = list(columns) + [geo_metadata['primary_column']]
+
+    sample_raw = gpd.read_parquet(sample_path, columns=columns)
+
+    if image_raw is not None:
+        left, bottom, right, top = image_footprint(image_raw, sample_raw.crs)
+        sample_raw = sample_raw.cx[left:right, bottom:top]
+
+    if rows is not None:
+        sample_raw = sample_raw.head(rows)
+
+    return sample_raw
+
+
+def read_sample(sample_path, columns=None, rows=None, image_raw=None):
+    '''
+    Reading depth sample file: ESRI Shapefile, GeoPackage or any other
+    vector file, GeoParquet, or CSV or XYZ point file. Only the geometry
+    and the given columns are read (all columns if None), and only the
+    first rows if given (e.g. to preview a large file). With image_raw,
+    only points inside the image footprint are read. For vector files the
+    footprint (in sample CRS) is given to the reader as bbox, so it uses
+    the spatial index of the file if there is one.
+    '''
+
+    import geopandas as gpd
+
+    extension = os.path.splitext(sample_path)[1].lower()
+
+    if extension in POINT_TABLE_EXTENSIONS:
+        return read_point_table(sample_path, columns, rows, image_raw)
+    if extension in PARQUET_EXTENSIONS:
+        return read_parquet_sample(sample_path, columns, rows, image_raw)
+
+    read_kwargs = {}
+    if columns is not None:
+        read_kwargs['columns'] = list(columns)
+    if rows is not None:
+        read_kwargs['rows'] = rows
+    if importlib.util.find_spec('pyogrio') is not None:
+        read_kwargs['engine'] = 'pyogrio'
+        # Arrow reading of pyogrio is a lot faster on large files
+        if importlib.util.find_spec('pyarrow') is not None:
+            read_kwargs['use_arrow'] = True
+
+    if image_raw is None:
+        return gpd.read_file(sample_path, **read_kwargs)
+
+    sample_crs = gpd.read_file(sample_path, rows=1).crs
+    read_kwargs['bbox'] = image_footprint(image_raw, sample_crs)
+
+    # Spatial index could return features in any order, they are put back
+    # in file order so the train and test split stays the same
+    if read_kwargs.get('engine') == 'pyogrio':
+        sample_raw = gpd.read_file(sample_path, fid_as_index=True, **read_kwargs)
+        return sample_raw.sort_index().reset_index(drop=True)
+
+    return gpd.read_file(sample_path, **read_kwargs)
+
+
+def sample_point_count(sample_path):
+    '''
+    Number of points in the whole depth sample file, counted without
+    reading the points where the file format allows it
+    '''
+
+    import geopandas as gpd
+
+    extension = os.path.splitext(sample_path)[1].lower()
+
+    if extension in POINT_TABLE_EXTENSIONS:
+        header = point_table_layout(sample_path)[1]
+        with open(sample_path) as sample_file:
+            line_count = sum(1 for line in sample_file if line.strip() != '')
+        return line_count - (1 if header == 0 else 0)
+
+    if extension in PARQUET_EXTENSIONS:
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(sample_path).metadata.num_rows
+
+    if importlib.util.find_spec('pyogrio') is not None:
+        import pyogrio
+
+        return pyogrio.read_info(sample_path, force_feature_count=True)['features']
+
+    return gpd.read_file(sample_path, ignore_geometry=True).shape[0]
+
+
+def load_sample(sample_path, columns=None, image_raw=None):
+    '''
+    Load depth sample file (only the geometry and the given columns if set,
+    only points inside the image footprint if image_raw is set) and make
+    sure every geometry is a point. The number of points of the whole file
+    is kept in attrs['point_count'] for the report and model cache key.
+    '''
+
+    sample_raw = read_sample(sample_path, columns, image_raw=image_raw)
+
+    if (sample_raw.geom_type != 'Point').any():
+        raise ValueError('Your data is not Point type. Please load another data!')
+
+    if image_raw is None:
+        sample_raw.attrs['point_count'] = sample_raw.shape[0]
+    else:
+        sample_raw.attrs['point_count'] = sample_point_count(sample_path)
+
+    return sample_raw
+
+
+def total_points(sample_raw):
+    '''
+    Number of points of the whole depth sample file sample_raw was read
+    from (it may be clipped to the image footprint)
+    '''
+
+    return sample_raw.attrs.get('point_count', sample_raw.shape[0])
+
+
+def spatial_blocks(x, y, block_size):
+    '''
+    Block number of every point on a square grid of block_size map units
+    '''
+
+    col = np.floor((x - np.min(x)) / block_size).astype('int64')
+    row = np.floor((y - np.min(y)) / block_size).astype('int64')
+
+    return np.unique(row * (col.max() + 1) + col, return_inverse=True)[1].ravel()
+
+
+def block_split(blocks, train_size, random_state):
+    '''
+    Train mask of a spatially blocked split: whole blocks are taken in a
+    random order into training data until it has the nearest number of
+    points to train_size, the other blocks are testing data. Neighbouring
+    points of one block are never in both.
+    '''
+
+    n_blocks = blocks.max() + 1
+    if n_blocks < 2:
+        raise ValueError('Depth sample is in one spatial block. Please use a smaller block size!')
+
+    counts = np.bincount(blocks, minlength=n_blocks)
+    order = np.random.default_rng(random_state).permutation(n_blocks)
+    cumulative = np.cumsum(counts[order])
+    target = train_size * len(blocks)
+
+    n_train = np.searchsorted(cumulative, target, side='right')
+    if n_train < n_blocks and (
+        n_train == 0 or cumulative[n_train] - target < target - cumulative[n_train - 1]
+    ):
+        n_train += 1
+    n_train = min(max(n_train, 1), n_blocks - 1)
+
+    train_block = np.zeros(n_blocks, dtype=bool)
+    train_block[order[:n_train]] = True
+
+    return train_block[blocks]
+
+
+def thin_sample(sample_df, pixel, proc_op_dict):
+    '''
+    Reducing depth samples to one point per image pixel (mean or median
+    depth at the mean location, band values are the same for every point
+    of a pixel) and keeping at most max_points random points per square
+    of cap_size map units. Returns the thinned samples and the number of
+    original points of each of them.
+    '''
+
+    import pandas as pd
+
+    counts = np.ones(sample_df.shape[0], dtype='int64')
+
+    if proc_op_dict['thinning'] != 'none':
+        grouped = sample_df.groupby(pixel, sort=False)
+
+        agg_dict = dict.fromkeys(sample_df.columns[:-3], 'first')
+        agg_dict.update({'x': 'mean', 'y': 'mean', 'z': proc_op_dict['thinning']})
+
+        counts = grouped.size().to_numpy()
+        sample_df = grouped.agg(agg_dict).reset_index(drop=True)
+
+    if proc_op_dict['max_points'] > 0:
+        cells = spatial_blocks(
+            sample_df['x'].to_numpy(), sample_df['y'].to_numpy(), proc_op_dict['cap_size']
+        )
+        order = np.random.default_rng(proc_op_dict['random_state']).permutation(len(cells))
+        rank = pd.Series(cells[order]).groupby(cells[order]).cumcount().to_numpy()
+        keep = np.sort(order[rank < proc_op_dict['max_points']])
+
+        counts = counts[keep]
+        sample_df = sample_df.iloc[keep].reset_index(drop=True)
+
+    return sample_df, pd.Series(counts, index=sample_df.index, name='count')
+
+
+def thinning_enabled(proc_op_dict):
+    '''
+    Whether depth samples are thinned before splitting
+    '''
+
+    return proc_op_dict['thinning'] != 'none' or proc_op_dict['max_points'] > 0
+
+
+def preprocess(
+    image_raw, sample_raw, inputs, proc_op_dict, callback, cancel=None, keep_nan_bands=False
+):
+    '''
+    Preparing input values to use on training models and predicting
+    depth by reprojecting depth sample CRS, sampling raster value and
+    depth value, and then limiting or not limiting depth value.
+    callback receives the text of each processing step as it starts,
+    cancel is checked before each step. With keep_nan_bands, points with
+    some missing band values are kept for methods handling them.
+    '''
+    print('Pre Processing')
+
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+
+    image_crs = str(image_raw.crs).upper()
+    sample_crs = str(sample_raw.crs).upper()
+
+    # Reproject sample CRS. Samples without CRS (CSV and XYZ point files)
+    # are in image CRS.
+    check_cancel(cancel)
+    if sample_raw.crs is None:
+        callback('Skip Reproject...\n')
+
+        sample_edit = sample_raw.set_crs(image_raw.crs)
+    elif image_crs != sample_crs:
+        callback('Reprojecting...\n')
+
+        sample_edit = sample_raw.to_crs(image_crs)
+    else:
+        callback('Skip Reproject...\n')
+
+        sample_edit = sample_raw.copy()
+
+    # Filtering
+    check_cancel(cancel)
+    if proc_op_dict['exclude_outside'] == True:
+        callback('Filtering Out of Bound Points...\n')
+
+        # Image boundary coordinates
+        x0, x1 = image_raw.bounds.left, image_raw.bounds.right
+        y0, y1 = image_raw.bounds.bottom, image_raw.bounds.top
+
+        # Filter out of bound points and reset index count
+        sample_edit = sample_edit[
+            (sample_edit['geometry'].x > x0) &
+            (sample_edit['geometry'].x < x1) &
+            (sample_edit['geometry'].y > y0) &
+            (sample_edit['geometry'].y < y1)
+        ].reset_index(drop=True)
+    elif proc_op_dict['exclude_outside'] == False:
+        callback('Skip Filtering Out of Bound Points...\n')
+
+    check_cancel(cancel)
+    callback('Point Sampling...\n')
+
+    # Define shp_geo variable because sample_edit['geometry'] is too long
+    shp_geo = sample_edit['geometry']
+
+    col_names = []
+
+    # Point Sampling
+    with parallel_backend(proc_op_dict['backend'], n_jobs=proc_op_dict['n_jobs']):
+
+        row, col = np.array(image_raw.index(shp_geo.x, shp_geo.y))
+        sample_array = sample_bands(
+            image_raw,
+            row,
+            col,
+            proc_op_dict['compute_dtype'],
+            proc_op_dict['tile_size']
+        )
+
+        for i in image_raw.indexes:
+            col_names.append('band' + str(i))
+
+    sample_df = pd.DataFrame(sample_array, columns=col_names)
+    sample_df['x'], sample_df['y'] = shp_geo.x, shp_geo.y
+    sample_df['z'] = sample_edit[inputs['depth_label']]
+
+    # Drop any missing values
+    if keep_nan_bands == True:
+        sample_df = sample_df.dropna(subset=['x', 'y', 'z'])
+        sample_df = sample_df.dropna(how='all', subset=col_names)
+    else:
+        sample_df = sample_df.dropna()
+
+    # Auto Negative
+    if proc_op_dict['auto_negative'] == True and np.median(sample_df['z']) > 0:
+        sample_df['z'] = sample_df['z'] * -1
+
+    # Depth Limit
+    if inputs['limit_state'] == False:
+        sample_df = sample_df[sample_df['z'] >= inputs['limit_b']]
+        sample_df = sample_df[sample_df['z'] <= inputs['limit_a']]
+
+    # Thinning, so many soundings of one pixel are fitted as one point
+    n_points = sample_df.shape[0]
+    sample_weight = None
+    if thinning_enabled(proc_op_dict):
+        pixel = row.astype('int64') * image_raw.width + col.astype('int64')
+        sample_df, counts = thin_sample(
+            sample_df, pixel[sample_df.index.to_numpy()], proc_op_dict
+        )
+        if proc_op_dict['count_weights'] == True and proc_op_dict['thinning'] != 'none':
+            sample_weight = counts
+
+    features_all = sample_df.iloc[:, 0:-1]
+    z = sample_df['z']
+
+    if proc_op_dict['split'] == 'block':
+        blocks = spatial_blocks(
+            features_all['x'].to_numpy(), features_all['y'].to_numpy(), proc_op_dict['block_size']
+        )
+        train_mask = block_split(blocks, inputs['train_size'], proc_op_dict['random_state'])
+
+        features_all_train, features_all_test = features_all[train_mask], features_all[~train_mask]
+        z_train, z_test = z[train_mask], z[~train_mask]
+    else:
+        features_all_train, features_all_test, z_train, z_test = train_test_split(
+            features_all,
+            z,
+            train_size=inputs['train_size'],
+            random_state=proc_op_dict['random_state']
+            )
+
+    features_train = features_all_train.iloc[:, 0:-2]
+    features_test = features_all_test.iloc[:, 0:-2]
+
+    if sample_weight is not None:
+        sample_weight = sample_weight.loc[z_train.index]
+
+    train_data = pd.concat([features_all_train, z_train], axis=1)
+    test_data = pd.concat([features_all_test, z_test], axis=1)
+    test_data = test_data.reset_index(drop=True)
+
+    samples_split = {
+        'features_train': features_train,
+        'features_test': features_test,
+        'z_train': z_train,
+        'z_test': z_test,
+        'train': train_data,
+        'test': test_data,
+        'sample_edit': sample_edit,
+        'sample_df': sample_df,
+        'sample_weight': sample_weight,
+        'n_points': n_points
+    }
+
+    return samples_split
+
+
+def knn_regressor(options):
+    '''
+    Preparing KNN regressor and its selected parameters for report
+    '''
+
+    from sklearn.neighbors import KNeighborsRegressor
+
+    knn_op_dict = options['knn']
+
+    regressor = KNeighborsRegressor(
+        n_neighbors=knn_op_dict['n_neighbors'],
+        weights=knn_op_dict['weights'],
+        algorithm=knn_op_dict['algorithm'],
+        leaf_size=knn_op_dict['leaf_size']
+    )
+
+    print_parameters_info = (
+        'N Neighbors:\t\t' + str(knn_op_dict['n_neighbors']) + '\n' +
+        'Weights:\t\t' + str(knn_op_dict['weights']) + '\n' +
+        'Algorithm:\t\t' + str(knn_op_dict['algorithm']) + '\n' +
+        'Leaf Size:\t\t' + str(knn_op_dict['leaf_size'])
+    )
+
+    return regressor, print_parameters_info
+
+
+def mlr_regressor(options):
+    '''
+    Preparing MLR regressor and its selected parameters for report
+    '''
+
+    from sklearn.linear_model import LinearRegression
+
+    mlr_op_dict = options['mlr']
+
+    regressor = LinearRegression(
+        fit_intercept=mlr_op_dict['fit_intercept'],
+        normalize=mlr_op_dict['normalize'],
+        copy_X=mlr_op_dict['copy_x']
+    )
+
+    print_parameters_info = (
+        'Fit Intercept:\t\t' + str(mlr_op_dict['fit_intercept']) + '\n' +
+        'Normalize:\t\t' + str(mlr_op_dict['normalize']) + '\n' +
+        'Copy X:\t\t' + str(mlr_op_dict['copy_x'])
+    )
+
+    return regressor, print_parameters_info
+
+
+def rf_regressor(options):
+    '''
+    Preparing RF regressor and its selected parameters for report
+    '''
+
+    from sklearn.ensemble import RandomForestRegressor
+
+    rf_op_dict = options['rf']
+
+    regressor = RandomForestRegressor(
+        n_estimators=rf_op_dict['n_estimators'],
+        criterion=rf_op_dict['criterion'],
+        bootstrap=rf_op_dict['bootstrap'],
+        random_state=rf_op_dict['random_state'])
+
+    print_parameters_info = (
+        'N Trees:\t\t' + str(rf_op_dict['n_estimators']) + '\n' +
+        'Criterion:\t\t' + str(rf_op_dict['criterion']) + '\n' +
+        'Bootstrap:\t\t' + str(rf_op_dict['bootstrap']) + '\n' +
+        'Random State:\t\t' + str(rf_op_dict['random_state'])
+    )
+
+    return regressor, print_parameters_info
+
+
+def svm_regressor(options):
+    '''
+    Preparing SVM regressor and its selected parameters for report
+    '''
+
+    from sklearn.svm import SVR
+
+    svm_op_dict = options['svm']
+
+    regressor = SVR(
+        kernel=svm_op_dict['kernel'],
+        gamma=svm_op_dict['gamma'],
+        C=svm_op_dict['c'],
+        degree=svm_op_dict['degree'],
+        cache_size=8000)
+
+    print_parameters_info = (
+        'Kernel:\t\t' + str(svm_op_dict['kernel']) +'\n' +
+        'Gamma:\t\t' + str(svm_op_dict['gamma']) + '\n' +
+        'C:\t\t' + str(svm_op_dict['c'])
+    )
+
+    if svm_op_dict['kernel'] == 'poly':
+        print_parameters_info = (
+            print_parameters_info + '\n' +
+            'Degree:\t\t' + str(svm_op_dict['degree'])
+        )
+
+    return regressor, print_parameters_info
+
+
+def svma_regressor(options):
+    '''
+    Preparing approximate SVM regressor and its selected parameters for
+    report: RBF kernel features (Nystroem or random Fourier features) of
+    n_components dimensions fitted by a linear solver, so fitting grows
+    linearly with the number of samples. Pixels are predicted batch_size
+    at a time (see predict_pixels), as the kernel features of a whole
+    tile would not fit in memory.
+    '''
+
+    from sklearn.kernel_approximation import Nystroem, RBFSampler
+    from sklearn.linear_model import Ridge
+    from sklearn.pipeline import Pipeline
+    from sklearn.svm import LinearSVR
+
+    svma_op_dict = options['svma']
+    random_state = options['proc']['random_state']
+
+    if svma_op_dict['approximation'] == 'nystroem':
+        features = Nystroem(
+            kernel='rbf',
+            gamma=svma_op_dict['gamma'],
+            n_components=svma_op_dict['n_components'],
+            random_state=random_state
+        )
+    else:
+        features = RBFSampler(
+            gamma=svma_op_dict['gamma'],
+            n_components=svma_op_dict['n_components'],
+            random_state=random_state
+        )
+
+    if svma_op_dict['solver'] == 'linear_svr':
+        solver = LinearSVR(
+            C=svma_op_dict['c'],
+            loss='squared_epsilon_insensitive',
+            dual=False,
+            random_state=random_state
+        )
+    else:
+        solver = Ridge(alpha=1 / (2 * svma_op_dict['c']))
+
+    regressor = Pipeline([('features', features), ('solver', solver)])
+    regressor.predict_batch_size = svma_op_dict['batch_size']
+
+    print_parameters_info = (
+        'Approximation:\t\t' + APPROXIMATION_DICT[svma_op_dict['approximation']] + '\n' +
+        'Gamma:\t\t' + str(svma_op_dict['gamma']) + '\n' +
+        'Components:\t\t' + str(svma_op_dict['n_components']) + '\n' +
+        'Solver:\t\t' + SOLVER_DICT[svma_op_dict['solver']] + '\n' +
+        'C:\t\t' + str(svma_op_dict['c']) + '\n' +
+        'Batch Size:\t\t' + str(svma_op_dict['batch_size'])
+    )
+
+    return regressor, print_parameters_info
+
+
+def hgb_regressor(options):
+    '''
+    Preparing Histogram Gradient Boosting regressor and its selected
+    parameters for report. Band values are binned into histograms, so
+    fitting and predicting are multithreaded and much faster than Random
+    Forest. With missing values enabled, missing band values are kept as
+    NaN for the regressor instead of VAL_IF_NAN (see predict_nan_value).
+    '''
+
+    from sklearn.ensemble import HistGradientBoostingRegressor
+
+    hgb_op_dict = options['hgb']
+
+    regressor = HistGradientBoostingRegressor(
+        learning_rate=hgb_op_dict['learning_rate'],
+        max_iter=hgb_op_dict['max_iter'],
+        max_leaf_nodes=hgb_op_dict['max_leaf_nodes'],
+        min_samples_leaf=hgb_op_dict['min_samples_leaf'],
+        l2_regularization=hgb_op_dict['l2_regularization'],
+        early_stopping=hgb_op_dict['early_stopping'],
+        validation_fraction=hgb_op_dict['validation_fraction'],
+        n_iter_no_change=hgb_op_dict['n_iter_no_change'],
+        random_state=hgb_op_dict['random_state']
+    )
+    if hgb_op_dict['missing_values'] == True:
+        regressor.predict_nan_value = np.nan
+
+    early_stopping = {v: k for k, v in EARLY_STOPPING_DICT.items()}[hgb_op_dict['early_stopping']]
+
+    print_parameters_info = (
+        'Learning Rate:\t\t' + str(hgb_op_dict['learning_rate']) + '\n' +
+        'Max Iterations:\t\t' + str(hgb_op_dict['max_iter']) + '\n' +
+        'Max Leaf Nodes:\t\t' + str(hgb_op_dict['max_leaf_nodes']) + '\n' +
+        'Min Samples Leaf:\t' + str(hgb_op_dict['min_samples_leaf']) + '\n' +
+        'L2 Regularization:\t' + str(hgb_op_dict['l2_regularization']) + '\n' +
+        'Early Stopping:\t\t' + early_stopping + '\n' +
+        'Missing Values:\t\t' + str(hgb_op_dict['missing_values']) + '\n' +
+        'Random State:\t\t' + str(hgb_op_dict['random_state'])
+    )
+
+    return regressor, print_parameters_info
+
+
+METHOD_DICT = {
+    'K-Nearest Neighbors': knn_regressor,
+    'Multiple Linear Regression': mlr_regressor,
+    'Random Forest': rf_regressor,
+    'Support Vector Machines': svm_regressor,
+    'SVM (approximate)': svma_regressor,
+    'Histogram Gradient Boosting': hgb_regressor
+}
+
+METHOD_OPTION_DICT = {
+    'K-Nearest Neighbors': 'knn',
+    'Multiple Linear Regression': 'mlr',
+    'Random Forest': 'rf',
+    'Support Vector Machines': 'svm',
+    'SVM (approximate)': 'svma',
+    'Histogram Gradient Boosting': 'hgb'
+}
+
+
+def predict_nan_value(regressor):
+    '''
+    Value given to missing band values of the pixels to predict:
+    NaN for regressors handling them natively, VAL_IF_NAN for the others
+    '''
+
+    return getattr(regressor, 'predict_nan_value', VAL_IF_NAN)
+
+
+def depth_limit(z_predict, inputs):
+    '''
+    Changing predicted values outside of depth limit window
+    into NaN (if depth limitation is enabled)
+    '''
+
+    if inputs['limit_state'] == False:
+        z_predict[z_predict < inputs['limit_b']] = np.nan
+        z_predict[z_predict > inputs['limit_a']] = np.nan
+
+    return z_predict
+
+
+def check_water_mask(image_raw, proc_op_dict):
+    '''
+    Checking water mask options against the image before processing
+    '''
+
+    if proc_op_dict['water_mask'] == 'index':
+        for band in [proc_op_dict['mask_band_a'], proc_op_dict['mask_band_b']]:
+            if band < 1 or band > image_raw.count:
+                raise ValueError(
+                    'Water mask band ' + str(band) + ' is not in the image!'
+                )
+    elif proc_op_dict['water_mask'] == 'file':
+        if proc_op_dict['mask_path'] is None or not os.path.exists(proc_op_dict['mask_path']):
+            raise ValueError('Water mask file is not found!')
+
+
+def open_water_mask(image_raw, proc_op_dict):
+    '''
+    Preparing water mask source of an image. Returns None for normalized
+    difference index or disabled water mask, polygons in image CRS for
+    vector mask file, or raster mask file warped onto the image grid.
+    '''
+
+    if proc_op_dict['water_mask'] != 'file':
+        return None
+
+    try:
+        mask_raw = rio.open(proc_op_dict['mask_path'])
+    except RasterioIOError:
+        import geopandas as gpd
+
+        mask_gdf = gpd.read_file(proc_op_dict['mask_path'])
+        return list(mask_gdf.to_crs(image_raw.crs).geometry)
+
+    return WarpedVRT(
+        mask_raw,
+        crs=image_raw.crs,
+        transform=image_raw.transform,
+        width=image_raw.width,
+        height=image_raw.height,
+        resampling=Resampling.nearest
+    )
+
+
+def close_water_mask(mask_source):
+    '''
+    Closing raster water mask (if any)
+    '''
+
+    if isinstance(mask_source, WarpedVRT):
+        mask_source.close()
+        mask_source.src_dataset.close()
+
+
+def water_mask(mask_source, bands_array, image_raw, proc_op_dict, window=None):
+    '''
+    Boolean water mask (True on water) of the pixels of bands_array.
+    Water is where the normalized difference index of band a and band b
+    (e.g. NDWI of green and NIR, or MNDWI of green and SWIR) is above the
+    threshold, or inside the mask file (nonzero raster value or polygon).
+    Returns None when water mask is disabled.
+    '''
+
+    if proc_op_dict['water_mask'] == 'none':
+        return None
+
+    if proc_op_dict['water_mask'] == 'index':
+        band_a = bands_array[:, proc_op_dict['mask_band_a'] - 1]
+        band_b = bands_array[:, proc_op_dict['mask_band_b'] - 1]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            index = (band_a - band_b) / (band_a + band_b)
+
+        return index > proc_op_dict['mask_threshold']
+
+    if window is None:
+        window = Window(0, 0, image_raw.width, image_raw.height)
+
+    if isinstance(mask_source, list):
+        water = geometry_mask(
+            mask_source,
+            out_shape=(int(window.height), int(window.width)),
+            transform=image_raw.window_transform(window),
+            invert=True
+        )
+    else:
+        water = mask_source.read(1, window=window, masked=True).filled(0) != 0
+
+    return water.ravel()
+
+
+def predict_batches(regressor, bands_array, dtype):
+    '''
+    Predicting depth of the pixels of bands_array, predict_batch_size
+    pixels at a time for regressors which set it (SVM (approximate)),
+    all at once for the others
+    '''
+
+    batch_size = getattr(regressor, 'predict_batch_size', None)
+    if batch_size is None or bands_array.shape[0] <= batch_size:
+        return regressor.predict(bands_array).astype(dtype, copy=False)
+
+    z_predict = np.empty(bands_array.shape[0], dtype=dtype)
+    for start in range(0, bands_array.shape[0], batch_size):
+        stop = start + batch_size
+        z_predict[start:stop] = regressor.predict(bands_array[start:stop])
+
+    return z_predict
+
+
+def predict_pixels(regressor, bands_array, water, dtype):
+    '''
+    Predicting depth of water pixels only (all pixels if water is None),
+    the other pixels are NaN
+    '''
+
+    if water is None:
+        return predict_batches(regressor, bands_array, dtype)
+
+    z_predict = np.full(bands_array.shape[0], np.nan, dtype=dtype)
+    if water.any():
+        z_predict[water] = predict_batches(regressor, bands_array[water], dtype)
+
+    return z_predict
+
+
+def predict_full(regressor, image_raw, inputs, proc_op_dict, mask_source=None, cancel=None):
+    '''
+    Predicting depth of every image pixel at once
+    '''
+
+    check_cancel(cancel)
+
+    bands_array = read_bands(
+        image_raw, predict_nan_value(regressor), proc_op_dict['compute_dtype']
+    )
+    water = water_mask(mask_source, bands_array, image_raw, proc_op_dict)
+    z_predict = predict_pixels(regressor, bands_array, water, proc_op_dict['compute_dtype'])
+
+    return depth_limit(z_predict, inputs)
+
+
+def predict_tiled(regressor, image_raw, inputs, proc_op_dict, mask_source=None, cancel=None):
+    '''
+    Predicting depth tile by tile using rasterio windows and writing
+    each tile straight into a temporary GeoTIFF, so only one tile
+    of pixels is held in memory at a time. cancel is checked before
+    every tile and the temporary GeoTIFF is removed when cancelled.
+    '''
+    fd, predict_path = tempfile.mkstemp(prefix='sdb_predict_', suffix='.tif')
+    os.close(fd)
+
+    predict_raw = rio.open(
+        predict_path,
+        'w',
+        driver='GTiff',
+        height=image_raw.height,
+        width=image_raw.width,
+        count=1,
+        dtype=proc_op_dict['compute_dtype'],
+        crs=image_raw.crs,
+        transform=image_raw.transform
+    )
+
+    try:
+        for window in tile_windows(image_raw.height, image_raw.width, proc_op_dict['tile_size']):
+            check_cancel(cancel)
+            tile_array = read_bands(
+                image_raw, predict_nan_value(regressor), proc_op_dict['compute_dtype'], window=window
+            )
+            water = water_mask(mask_source, tile_array, image_raw, proc_op_dict, window=window)
+            z_tile = predict_pixels(regressor, tile_array, water, proc_op_dict['compute_dtype'])
+            z_tile = depth_limit(z_tile, inputs)
+            predict_raw.write(z_tile.reshape(window.height, window.width), 1, window=window)
+    except BaseException:
+        predict_raw.close()
+        os.remove(predict_path)
+        raise
+
+    predict_raw.close()
+
+    return predict_path
+
+
+def predict_image(regressor, image_raw, inputs, proc_op_dict, cancel=None):
+    '''
+    Predicting depth of an image using a fitted regressor, tile by tile or
+    the whole scene at once, within the water mask (if enabled).
+    Returns predicted array (full scene) or temporary raster location (tiled).
+    '''
+
+    mask_source = open_water_mask(image_raw, proc_op_dict)
+
+    try:
+        if proc_op_dict['tiled_predict'] == True:
+            z_predict = None
+            z_predict_path = predict_tiled(
+                regressor, image_raw, inputs, proc_op_dict, mask_source, cancel
+            )
+        else:
+            z_predict = predict_full(
+                regressor, image_raw, inputs, proc_op_dict, mask_source, cancel
+            )
+            z_predict_path = None
+    finally:
+        close_water_mask(mask_source)
+
+    return z_predict, z_predict_path
+
+
+def fit_kwargs(regressor, sample_weight):
+    '''
+    Keyword arguments of regressor.fit: count weights of thinned samples
+    when the method supports them (KNN does not), given to the last step
+    of a pipeline
+    '''
+
+    from sklearn.pipeline import Pipeline
+    from sklearn.utils.validation import has_fit_parameter
+
+    if sample_weight is None:
+        return {}
+
+    if isinstance(regressor, Pipeline):
+        step_name, estimator = regressor.steps[-1]
+        if has_fit_parameter(estimator, 'sample_weight'):
+            return {step_name + '__sample_weight': sample_weight}
+        return {}
+
+    if not has_fit_parameter(regressor, 'sample_weight'):
+        return {}
+
+    return {'sample_weight': sample_weight}
+
+
+def fit_regressor(regressor, features_train, z_train, cancel=None, sample_weight=None):
+    '''
+    Fitting regressor to training data. When the fit could be cancelled,
+    Random Forest is grown in chunks of trees using warm start (giving
+    the same forest as growing it at once) and cancel is checked
+    between chunks.
+    '''
+
+    from sklearn.ensemble import RandomForestRegressor
+
+    check_cancel(cancel)
+    kwargs = fit_kwargs(regressor, sample_weight)
+
+    if cancel is None or not isinstance(regressor, RandomForestRegressor):
+        return regressor.fit(features_train, z_train, **kwargs)
+
+    n_estimators = regressor.n_estimators
+    chunk = max(joblib.effective_n_jobs(regressor.n_jobs), n_estimators // 10)
+
+    regressor.set_params(warm_start=True)
+    try:
+        for n_trees in range(chunk, n_estimators + chunk, chunk):
+            check_cancel(cancel)
+            regressor.set_params(n_estimators=min(n_trees, n_estimators))
+            regressor.fit(features_train, z_train, **kwargs)
+    finally:
+        regressor.set_params(warm_start=False, n_estimators=n_estimators)
+
+    return regressor
+
+
+def tuning_enabled(options):
+    '''
+    Whether hyperparameters are searched by cross validation before fitting
+    '''
+
+    return options['tune']['search'] != 'none'
+
+
+def process_steps(options):
+    '''
+    Number of processing steps process() sends to callback
+    (e.g. maximum of a progress bar)
+    '''
+
+    if tuning_enabled(options):
+        return PROGRESS_STEP + 1
+
+    return PROGRESS_STEP
+
+
+def cv_folds(samples_split, options):
+    '''
+    Train and test row positions of each cross validation fold of the
+    training data: random k-fold, or group k-fold of spatial blocks
+    (block_size of processing options) so neighbouring points of one
+    block are never in both
+    '''
+
+    from sklearn.model_selection import GroupKFold, KFold
+
+    tune_op_dict, proc_op_dict = options['tune'], options['proc']
+    features_train, z_train = samples_split['features_train'], samples_split['z_train']
+
+    if tune_op_dict['cv'] == 'block':
+        blocks = spatial_blocks(
+            samples_split['train']['x'].to_numpy(),
+            samples_split['train']['y'].to_numpy(),
+            proc_op_dict['block_size']
+        )
+        if blocks.max() + 1 < tune_op_dict['folds']:
+            raise ValueError(
+                'Training data has fewer spatial blocks than cross validation folds. '
+                'Please use a smaller block size!'
+            )
+        splitter = GroupKFold(n_splits=tune_op_dict['folds'])
+        return list(splitter.split(features_train, z_train, blocks))
+
+    splitter = KFold(
+        n_splits=tune_op_dict['folds'], shuffle=True, random_state=proc_op_dict['random_state']
+    )
+
+    return list(splitter.split(features_train, z_train))
+
+
+def cv_name(options):
+    '''
+    Report name of the cross validation
+    '''
+
+    tune_op_dict = options['tune']
+
+    if tune_op_dict['cv'] == 'block':
+        return (
+            str(tune_op_dict['folds']) + '-Fold Spatial Block (' +
+            str(options['proc']['block_size']) + ' m)'
+        )
+
+    return str(tune_op_dict['folds']) + '-Fold'
+
+
+def search_candidates(grid, tune_op_dict, random_state):
+    '''
+    Parameter sets to evaluate: every combination of the grid, or n_iter
+    random combinations of it for random search
+    '''
+
+    from sklearn.model_selection import ParameterGrid, ParameterSampler
+
+    if tune_op_dict['search'] == 'random':
+        n_iter = min(tune_op_dict['n_iter'], len(ParameterGrid(grid)))
+        return list(ParameterSampler(grid, n_iter, random_state=random_state))
+
+    return list(ParameterGrid(grid))
+
+
+def fold_rmse(regressor, params, features, z, sample_weight, train, test):
+    '''
+    RMSE of a copy of regressor with params, fitted on the train rows
+    (weighted by sample_weight if given) and validated on the test rows of
+    one fold. NaN if the parameters can't be fitted (e.g. more neighbors
+    than training points).
+    '''
+
+    from sklearn.base import clone
+
+    model = clone(regressor).set_params(**params)
+    if sample_weight is not None:
+        sample_weight = sample_weight.iloc[train]
+
+    try:
+        model.fit(features.iloc[train], z.iloc[train], **fit_kwargs(model, sample_weight))
+        z_validate = model.predict(features.iloc[test])
+    except ValueError:
+        return np.nan
+
+    return float(np.sqrt(np.mean((z.iloc[test].to_numpy() - z_validate) ** 2)))
+
+
+def rank_key(score):
+    '''
+    Sorting key of candidate scores: most training points first,
+    then lowest mean RMSE, failed candidates last
+    '''
+
+    rmse = score['rmse']
+
+    return (-score['n_samples'], np.inf if np.isnan(rmse) else rmse)
+
+
+def evaluate_candidates(
+    regressor, candidates, features, z, sample_weight, folds, options, cancel=None
+):
+    '''
+    Cross validation RMSE (mean and standard deviation over the folds) of
+    every candidate. Folds of as many candidates as there are processing
+    cores run at once under the current parallel_backend, cancel is checked
+    between them. Scores of each candidate are cached when both model cache
+    and tuning cache are enabled, so repeated or extended searches only
+    evaluate new candidates.
+    '''
+
+    from joblib import Parallel, delayed
+    import sklearn
+
+    tune_op_dict, proc_op_dict = options['tune'], options['proc']
+    use_cache = proc_op_dict['model_cache'] == True and tune_op_dict['cache'] == True
+
+    data_hash = hashlib.sha256()
+    data_hash.update(np.ascontiguousarray(features, dtype='float64').tobytes())
+    data_hash.update(np.ascontiguousarray(z, dtype='float64').tobytes())
+    if sample_weight is not None:
+        data_hash.update(np.ascontiguousarray(sample_weight, dtype='float64').tobytes())
+    for train, test in folds:
+        data_hash.update(np.ascontiguousarray(train).tobytes())
+        data_hash.update(np.ascontiguousarray(test).tobytes())
+
+    def cache_key(params):
+        key_dict = {
+            'version': SDB_GUI_VERSION,
+            'sklearn': sklearn.__version__,
+            'data': data_hash.hexdigest(),
+            'regressor': type(regressor).__name__,
+            'base': regressor.get_params(),
+            'params': params
+        }
+        return 'cv_' + hashlib.sha256(
+            json.dumps(key_dict, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+    n_samples = max(len(train) for train, _ in folds)
+    batch_size = max(1, joblib.effective_n_jobs(None))
+    scores = []
+
+    for start in range(0, len(candidates), batch_size):
+        check_cancel(cancel)
+        batch = candidates[start:start + batch_size]
+
+        fold_scores = {}
+        for i, params in enumerate(batch):
+            if use_cache == True:
+                cached = load_cached_model(proc_op_dict['cache_dir'], cache_key(params))
+                if cached is not None:
+                    fold_scores[i] = (cached['fold_rmse'], True)
+
+        todo = [i for i in range(len(batch)) if i not in fold_scores]
+        results = Parallel()(
+            delayed(fold_rmse)(regressor, batch[i], features, z, sample_weight, train, test)
+            for i in todo
+            for train, test in folds
+        )
+
+        for n, i in enumerate(todo):
+            rmse_list = results[n * len(folds):(n + 1) * len(folds)]
+            fold_scores[i] = (rmse_list, False)
+            if use_cache == True:
+                save_cached_model(
+                    proc_op_dict['cache_dir'],
+                    cache_key(batch[i]),
+                    {'fold_rmse': rmse_list},
+                    proc_op_dict['cache_size']
+                )
+
+        for i, params in enumerate(batch):
+            rmse_list, cached = fold_scores[i]
+            scores.append({
+                'params': params,
+                'rmse': float(np.mean(rmse_list)),
+                'rmse_std': float(np.std(rmse_list)),
+                'n_samples': n_samples,
+                'cached': cached
+            })
+
+    return scores
+
+
+def tune_regressor(regressor, method, samples_split, options, cancel=None):
+    '''
+    Searching hyperparameters of regressor over the grid of the method in
+    tuning options, by cross validation on the training data: every
+    combination (grid search), n_iter random combinations (random search),
+    or successive halving, which evaluates every combination on a part of
+    the training points and keeps the best 1 / factor of them for the next
+    round on factor times more points. The best parameters are set on
+    regressor. Returns the search summary.
+    '''
+
+    tune_op_dict = options['tune']
+    random_state = options['proc']['random_state']
+    features_train, z_train = samples_split['features_train'], samples_split['z_train']
+    sample_weight = samples_split.get('sample_weight')
+
+    grid = tune_op_dict['grid'][METHOD_OPTION_DICT[method]]
+    candidates = search_candidates(grid, tune_op_dict, random_state)
+    folds = cv_folds(samples_split, options)
+
+    if tune_op_dict['search'] != 'halving':
+        scores = evaluate_candidates(
+            regressor, candidates, features_train, z_train, sample_weight, folds, options, cancel
+        )
+    else:
+        factor = tune_op_dict['factor']
+        n_rounds = max(1, int(np.ceil(np.log(len(candidates)) / np.log(factor))))
+
+        # Training points are added to the rounds in a random order
+        order = np.random.default_rng(random_state).permutation(len(z_train))
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+
+        scores = []
+        round_candidates = candidates
+        for round_index in range(n_rounds):
+            n_points = max(
+                len(z_train) // factor ** (n_rounds - 1 - round_index),
+                min(len(z_train), HALVING_MIN_SAMPLES)
+            )
+            round_folds = [(train[rank[train] < n_points], test) for train, test in folds]
+
+            round_scores = evaluate_candidates(
+                regressor, round_candidates, features_train, z_train, sample_weight,
+                round_folds, options, cancel
+            )
+            scores.extend(round_scores)
+
+            n_keep = int(np.ceil(len(round_candidates) / factor))
+            round_candidates = [
+                score['params'] for score in sorted(round_scores, key=rank_key)[:n_keep]
+            ]
+
+    scores = sorted(scores, key=rank_key)
+    best = scores[0]
+    if np.isnan(best['rmse']):
+        raise ValueError('No tuning candidate could be fitted. Please check the tuning grid!')
+
+    regressor.set_params(**best['params'])
+
+    return {
+        'search': tune_op_dict['search'],
+        'cv': cv_name(options),
+        'candidates': len(candidates),
+        'fits': sum(len(folds) for score in scores if score['cached'] == False),
+        'cached': sum(1 for score in scores if score['cached'] == True),
+        'best_params': best['params'],
+        'best_rmse': best['rmse'],
+        'best_rmse_std': best['rmse_std'],
+        'scores': scores
+    }
+
+
+def params_text(params):
+    '''
+    One line text of a parameter set
+    '''
+
+    return ', '.join(key + '=' + str(params[key]) for key in sorted(params))
+
+
+def tuning_info(tuning):
+    '''
+    Hyperparameter search summary of the report, with the five best
+    candidates
+    '''
+
+    print_tuning_info = (
+        'Tuning:\t\t' + TUNE_SEARCH_DICT[tuning['search']] +
+        ' (' + tuning['cv'] + ' Cross Validation)\n' +
+        'Candidates:\t\t' + str(tuning['candidates']) + ' (' +
+        str(tuning['fits']) + ' fits, ' + str(tuning['cached']) + ' cached)\n' +
+        'Best Parameters:\t' + params_text(tuning['best_params']) + '\n' +
+        'Best CV RMSE:\t\t' + str(round(tuning['best_rmse'], 4)) +
+        ' \u00B1 ' + str(round(tuning['best_rmse_std'], 4)) + '\n'
+    )
+
+    for score in tuning['scores'][:5]:
+        print_tuning_info += (
+            '  ' + str(round(score['rmse'], 4)) + ' (' + str(score['n_samples']) +
+            ' points)\t' + params_text(score['params']) + '\n'
+        )
+
+    return print_tuning_info
+
+
+def model_cache_key(image_raw, sample_raw, inputs, options):
+    '''
+    Key of a cached model: fingerprint of the image file (location, size and
+    modification time), hash of the sample points and depth values, and every
+    input and option which changes the sampled data or the fitted model
+    '''
+
+    import sklearn
+
+    proc_op_dict = options['proc']
+    image_stat = os.stat(image_raw.name)
+
+    sample_hash = hashlib.sha256()
+    for values in [
+        sample_raw['geometry'].x,
+        sample_raw['geometry'].y,
+        sample_raw[inputs['depth_label']]
+    ]:
+        sample_hash.update(np.ascontiguousarray(values, dtype='float64').tobytes())
+    sample_hash.update(str(sample_raw.crs).encode())
+
+    key_dict = {
+        'version': SDB_GUI_VERSION,
+        'sklearn': sklearn.__version__,
+        'image': [os.path.abspath(image_raw.name), image_stat.st_size, image_stat.st_mtime_ns],
+        'sample': sample_hash.hexdigest(),
+        'sample_points': total_points(sample_raw),
+        'inputs': {key: inputs[key] for key in INPUT_KEYS},
+        'proc': {key: proc_op_dict[key] for key in CACHE_PROC_KEYS},
+        'method': options[METHOD_OPTION_DICT[inputs['method']]]
+    }
+    if tuning_enabled(options):
+        key_dict['tune'] = options['tune']
+
+    return hashlib.sha256(json.dumps(key_dict, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def load_cached_model(cache_dir, key):
+    '''
+    Loading cached samples and fitted model, or None if it is not cached
+    '''
+
+    cache_path = os.path.join(cache_dir, key + '.joblib')
+
+    try:
+        cached = joblib.load(cache_path)
+        # Mark as recently used
+        os.utime(cache_path)
+    except Exception:
+        # Missing or unreadable cache file
+        return None
+
+    return cached
+
+
+def save_cached_model(cache_dir, key, cached, cache_size):
+    '''
+    Saving samples and fitted model into cache directory, then removing
+    least recently used cached models until the cache fits cache_size MB
+    '''
+
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_path = os.path.join(cache_dir, key + '.joblib')
+    temp_path = cache_path + '.' + str(os.getpid()) + '.tmp'
+
+    joblib.dump(cached, temp_path)
+    os.replace(temp_path, cache_path)
+
+    cache_files = []
+    for path in glob(os.path.join(cache_dir, '*.joblib')):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        cache_files.append((stat.st_mtime, stat.st_size, path))
+
+    total_size = sum(size for _, size, _ in cache_files)
+    for _, size, path in sorted(cache_files):
+        if total_size <= cache_size * 2**20:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total_size -= size
+
+
+def process(image_raw, sample_raw, inputs, options, callback, cancel=None):
+    '''
+    Running the whole SDB processing (see fit_predict) while profiling
+    each processing step. The profile is added to the result.
+    callback receives the text of each processing step as it starts.
+    cancel (JobControl) is checked between the steps, tiles and chunks
+    of trees, until prediction is done.
+    '''
+
+    profiler = Profiler(callback)
+    try:
+        result = fit_predict(image_raw, sample_raw, inputs, options, profiler.step, cancel)
+    finally:
+        profiler.close()
+
+    try:
+        result['profile'] = run_profile(
+            profiler, image_raw, inputs['method'], options['proc'], result
+        )
+    except BaseException:
+        remove_prediction(result)
+        raise
+
+    return result
+
+
+def fit_predict(image_raw, sample_raw, inputs, options, callback, cancel=None):
+    '''
+    Reprojecting, filtering and sampling depth samples, then fitting
+    training data to the chosen model, making prediction based on the
+    trained model and validating it. Samples and fitted model are taken
+    from model cache (if enabled) when the same inputs were processed
+    before.
+    '''
+
+    proc_op_dict = options['proc']
+    check_water_mask(image_raw, proc_op_dict)
+
+    cached = None
+    if proc_op_dict['model_cache'] == True:
+        cache_key = model_cache_key(image_raw, sample_raw, inputs, options)
+        cached = load_cached_model(proc_op_dict['cache_dir'], cache_key)
+
+    if cached is not None:
+        model_cache = 'Used'
+        samples_split = cached['samples_split']
+        regressor = cached['regressor']
+        print_parameters_info = cached['parameters_info']
+        tuning = cached.get('tuning')
+
+        callback('Skip Reproject (Cached Model)...\n')
+        callback('Skip Filtering (Cached Model)...\n')
+        callback('Skip Point Sampling (Cached Model)...\n')
+    else:
+        regressor, print_parameters_info = METHOD_DICT[inputs['method']](options)
+        samples_split = preprocess(
+            image_raw, sample_raw, inputs, proc_op_dict, callback, cancel,
+            keep_nan_bands=np.isnan(predict_nan_value(regressor))
+        )
+
+    with parallel_backend(proc_op_dict['backend'], n_jobs=proc_op_dict['n_jobs']):
+
+        if cached is not None:
+            if tuning_enabled(options):
+                callback('Skip Tuning (Cached Model)...\n')
+            callback('Skip Fitting (Cached Model)...\n')
+        else:
+            tuning = None
+            if tuning_enabled(options):
+                callback('Tuning...\n')
+                tuning = tune_regressor(
+                    regressor, inputs['method'], samples_split, options, cancel
+                )
+                print_parameters_info += '\nTuned:\t\t' + params_text(tuning['best_params'])
+
+            callback('Fitting...\n')
+            fit_regressor(
+                regressor,
+                samples_split['features_train'],
+                samples_split['z_train'],
+                cancel,
+                samples_split.get('sample_weight')
+            )
+
+            if proc_op_dict['model_cache'] == True:
+                model_cache = 'Saved'
+                save_cached_model(
+                    proc_op_dict['cache_dir'],
+                    cache_key,
+                    {
+                        'samples_split': samples_split,
+                        'regressor': regressor,
+                        'parameters_info': print_parameters_info,
+                        'tuning': tuning
+                    },
+                    proc_op_dict['cache_size']
+                )
+            else:
+                model_cache = 'Disabled'
+        callback('Predicting...\n')
+
+        z_predict, z_predict_path = predict_image(
+            regressor, image_raw, inputs, proc_op_dict, cancel
+        )
+        try:
+            callback('Validating...\n')
+
+            import pandas as pd
+            from sklearn import metrics
+
+            z_test = samples_split['z_test']
+            z_validate = predict_batches(regressor, samples_split['features_test'], 'float64')
+            rmse = np.sqrt(metrics.mean_squared_error(z_test, z_validate))
+            mae = metrics.mean_absolute_error(z_test, z_validate)
+            r2 = metrics.r2_score(z_test, z_validate)
+            z_validate_df = pd.DataFrame({'z_validate': z_validate})
+            test_data_update = pd.concat([samples_split['test'], z_validate_df], axis=1)
+            callback('Done.')
+        except BaseException:
+            # Temporary prediction raster of a failed run isn't returned
+            remove_prediction({'z_predict_path': z_predict_path})
+            raise
+
+    result = {
+        'z_predict': z_predict,
+        'z_predict_path': z_predict_path,
+        'rmse': rmse,
+        'mae': mae,
+        'r2': r2,
+        'train': samples_split['train'],
+        'test': test_data_update,
+        'sample_edit': samples_split['sample_edit'],
+        'sample_df': samples_split['sample_df'],
+        'sample_weight': samples_split.get('sample_weight'),
+        'n_points': samples_split.get('n_points'),
+        'parameters_info': print_parameters_info,
+        'tuning': tuning,
+        'model_cache': model_cache,
+        'compute_dtype': proc_op_dict['compute_dtype'],
+        'regressor': regressor
+    }
+
+    return result
+
+
+def run_profile(profiler, image_raw, method, proc_op_dict, result):
+    '''
+    Profile of a processing run: wall time, CPU time and memory of each
+    step, sizes of the main arrays, tile and worker counts, and the
+    software and machine it ran on
+    '''
+
+    import sklearn
+
+    itemsize = np.dtype(result['compute_dtype']).itemsize
+
+    if proc_op_dict['tiled_predict'] == True:
+        tile_height = min(proc_op_dict['tile_size'], image_raw.height)
+        tile_width = min(proc_op_dict['tile_size'], image_raw.width)
+        tile_count = len(list(
+            tile_windows(image_raw.height, image_raw.width, proc_op_dict['tile_size'])
+        ))
+    else:
+        tile_height, tile_width = image_raw.height, image_raw.width
+        tile_count = 1
+
+    array_dict = {
+        'bands_per_tile_mb': to_mb(tile_height * tile_width * image_raw.count * itemsize),
+        'prediction_per_tile_mb': to_mb(tile_height * tile_width * itemsize)
+    }
+    if result.get('z_predict') is not None:
+        array_dict['prediction_mb'] = to_mb(result['z_predict'].nbytes)
+    if result.get('sample_df') is not None:
+        array_dict['samples_mb'] = to_mb(result['sample_df'].memory_usage().sum())
+
+    stages = profiler.stages
+
+    return {
+        'version': SDB_GUI_VERSION,
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'machine': {
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'sklearn': sklearn.__version__,
+            'rasterio': rio.__version__
+        },
+        'image': {
+            'path': image_raw.name,
+            'width': image_raw.width,
+            'height': image_raw.height,
+            'bands': image_raw.count,
+            'dtype': image_raw.dtypes[0]
+        },
+        'method': method,
+        'compute_dtype': result['compute_dtype'],
+        'tiled_predict': proc_op_dict['tiled_predict'],
+        'tile_size': proc_op_dict['tile_size'],
+        'tile_count': tile_count,
+        'backend': proc_op_dict['backend'],
+        'n_jobs': proc_op_dict['n_jobs'],
+        'workers': joblib.effective_n_jobs(proc_op_dict['n_jobs']),
+        'arrays': array_dict,
+        'stages': stages,
+        'total': {
+            'wall_time_s': round(sum(stage['wall_time_s'] for stage in stages), 6),
+            'cpu_time_s': round(sum(stage['cpu_time_s'] for stage in stages), 6),
+            'peak_rss_mb': max(
+                [stage['peak_rss_mb'] for stage in stages if stage['peak_rss_mb'] is not None],
+                default=None
+            )
+        }
+    }
+
+
+def model_metadata(image_raw, inputs, options, result):
+    '''
+    Band layout and preprocessing metadata saved with a fitted model,
+    so it could be used to predict other images
+    '''
+
+    import sklearn
+
+    return {
+        'version': SDB_GUI_VERSION,
+        'sklearn': sklearn.__version__,
+        'method': inputs['method'],
+        'parameters_info': result['parameters_info'],
+        'band_count': image_raw.count,
+        'band_names': list(result['train'].columns[:image_raw.count]),
+        'band_dtypes': list(image_raw.dtypes),
+        'compute_dtype': result['compute_dtype'],
+        'nan_value': predict_nan_value(result['regressor']),
+        'inputs': {key: inputs[key] for key in INPUT_KEYS},
+        'auto_negative': options['proc']['auto_negative'],
+        'image': image_raw.name,
+        'crs': str(image_raw.crs),
+        'rmse': result['rmse'],
+        'mae': result['mae'],
+        'r2': result['r2']
+    }
+
+
+def save_model(save_path, regressor, metadata):
+    '''
+    Saving fitted model and its metadata into a joblib file next to
+    save_path. Returns model output info.
+    '''
+
+    model_save_loc = (
+        os.path.splitext(save_path)[0] +
+        '_model.joblib'
+    )
+
+    joblib.dump({'regressor': regressor, 'metadata': metadata}, model_save_loc)
+
+    model_size = os.path.getsize(model_save_loc)
+    print_model_info = (
+        'Model Output:\t\t' + model_save_loc + ' (' +
+        str(round(model_size / 2**10 / 2**10, 2)) + ' MB)\n'
+    )
+
+    return print_model_info
+
+
+def load_model(model_path):
+    '''
+    Loading fitted model and its metadata saved by save_model
+    '''
+
+    try:
+        model = joblib.load(model_path)
+    except Exception:
+        raise ValueError('Cannot load model file ' + str(model_path) + '!')
+
+    if not isinstance(model, dict) or 'regressor' not in model or 'metadata' not in model:
+        raise ValueError('Not an SDB GUI model file!')
+
+    return model
+
+
+def predict_only(image_raw, model_path, options, callback, cancel=None):
+    '''
+    Predicting depth of an image using a saved model without any depth
+    sample. Depth limit and compute data type of the model are used.
+    callback receives the text of each processing step as it starts,
+    cancel (JobControl) is checked between prediction tiles.
+    '''
+
+    profiler = Profiler(callback)
+    try:
+        proc_op_dict = dict(options['proc'])
+        check_water_mask(image_raw, proc_op_dict)
+
+        profiler.step('Loading Model...\n')
+        model = load_model(model_path)
+        metadata = model['metadata']
+
+        if image_raw.count != metadata['band_count']:
+            raise ValueError(
+                'The image has ' + str(image_raw.count) + ' bands, but the model needs ' +
+                str(metadata['band_count']) + ' bands!'
+            )
+
+        proc_op_dict['compute_dtype'] = metadata['compute_dtype']
+
+        profiler.step('Predicting...\n')
+        with parallel_backend(proc_op_dict['backend'], n_jobs=proc_op_dict['n_jobs']):
+            z_predict, z_predict_path = predict_image(
+                model['regressor'], image_raw, metadata['inputs'], proc_op_dict, cancel
+            )
+        profiler.step('Done.')
+    finally:
+        profiler.close()
+
+    result = {
+        'z_predict': z_predict,
+        'z_predict_path': z_predict_path,
+        'train': None,
+        'test': None,
+        'compute_dtype': metadata['compute_dtype'],
+        'model_metadata': metadata
+    }
+    try:
+        result['profile'] = run_profile(
+            profiler, image_raw, metadata['method'], proc_op_dict, result
+        )
+    except BaseException:
+        remove_prediction(result)
+        raise
+
+    return result
+
+
+def runtimes(time_list):
+    '''
+    Counting runtime of each processing step and the overall runtime
+    from the time values saved at the start of every step
+    '''
+
+    time_array = np.array(time_list)
+    time_diff = time_array[1:] - time_array[:-1]
+
+    return np.append(time_diff, time_list[-1] - time_list[0])
+
+
+def limit_info(inputs):
+    '''
+    Depth limit line of result information
+    '''
+
+    if inputs['limit_state'] == False:
+        print_limit = (
+            'Depth Limit:\t\tfrom ' + str(inputs['limit_a']) + ' m ' +
+            'to ' + str(inputs['limit_b']) + ' m'
+        )
+    else:
+        print_limit = (
+            'Depth Limit:\t\tDisabled'
+        )
+
+    return print_limit
+
+
+def split_info(proc_op_dict):
+    '''
+    Train and test split line of the report
+    '''
+
+    if proc_op_dict['split'] == 'block':
+        return 'Train Test Split:\tSpatial Blocks (' + str(proc_op_dict['block_size']) + ' m)\n'
+
+    return 'Train Test Split:\tRandom\n'
+
+
+def thinning_info(proc_op_dict, result):
+    '''
+    Sample thinning lines of the report
+    '''
+
+    if not thinning_enabled(proc_op_dict):
+        return ''
+
+    thinning_list = []
+    if proc_op_dict['thinning'] != 'none':
+        thinning_list.append(proc_op_dict['thinning'].capitalize() + ' depth per pixel')
+    if proc_op_dict['max_points'] > 0:
+        thinning_list.append(
+            'Max ' + str(proc_op_dict['max_points']) + ' points per ' +
+            str(proc_op_dict['cap_size']) + ' m square'
+        )
+
+    print_thinning_info = (
+        'Thinning:\t\t' + ', '.join(thinning_list) + ' (' + str(result['sample_df'].shape[0]) +
+        ' of ' + str(result['n_points']) + ' points)\n'
+    )
+
+    if proc_op_dict['count_weights'] == True and proc_op_dict['thinning'] != 'none':
+        if len(fit_kwargs(result['regressor'], result['sample_weight'])) > 0:
+            print_thinning_info += 'Count Weights:\t\tUsed\n'
+        else:
+            print_thinning_info += 'Count Weights:\t\tNot supported by method\n'
+
+    return print_thinning_info
+
+
+def prediction_info(proc_op_dict, result):
+    '''
+    Prediction mode, compute data type and water mask lines
+    of result information
+    '''
+
+    if proc_op_dict['water_mask'] == 'index':
+        print_mask = (
+            'Normalized Difference of Band ' + str(proc_op_dict['mask_band_a']) +
+            ' and ' + str(proc_op_dict['mask_band_b']) +
+            ' > ' + str(proc_op_dict['mask_threshold'])
+        )
+    elif proc_op_dict['water_mask'] == 'file':
+        print_mask = proc_op_dict['mask_path']
+    else:
+        print_mask = 'Disabled'
+
+    if result['z_predict_path'] is not None:
+        predict_mode = 'Tiled (' + str(proc_op_dict['tile_size']) + ' px)'
+    else:
+        predict_mode = 'Full Scene'
+
+    print_prediction_info = (
+        'Prediction Mode:\t' + predict_mode + '\n' +
+        'Compute Data Type:\t' + result['compute_dtype'] + '\n' +
+        'Water Mask:\t\t' + print_mask
+    )
+
+    return print_prediction_info
+
+
+def image_info(image_raw):
+    '''
+    CRS, dimensions and pixel size lines of result information
+    '''
+
+    coord1 = np.array(image_raw.transform * (0, 0))
+    coord2 = np.array(image_raw.transform * (1, 1))
+    pixel_size = abs(coord2 - coord1)
+
+    print_image_info = (
+        'CRS:\t\t' + str(image_raw.crs) + '\n'
+        'Dimensions:\t\t' + str(image_raw.width) + ' x ' +
+        str(image_raw.height) + ' pixels\n' +
+        'Pixel Size:\t\t' + str(pixel_size[0]) + ' , ' +
+        str(pixel_size[1]) + '\n\n'
+    )
+
+    return print_image_info
+
+
+def result_info(image_path, sample_path, image_raw, sample_raw, inputs, options, result, time_list):
+    '''
+    Creating result information text of a processing run for
+    the result text browser and the report
+    '''
+
+    proc_op_dict = options['proc']
+
+    if proc_op_dict['auto_negative'] == True:
+        auto_negative = 'Enabled'
+    elif proc_op_dict['auto_negative'] == False:
+        auto_negative = 'Disabled'
+
+    runtime = list(runtimes(time_list))
+
+    # Tuning step comes before fitting
+    if tuning_enabled(options):
+        tuning_runtime = 'Tuning Runtime:\t\t' + str(runtime.pop(3)) + '\n'
+        print_tuning_info = tuning_info(result['tuning']) + '\n'
+    else:
+        tuning_runtime = ''
+        print_tuning_info = ''
+
+    img_size = os.path.getsize(image_path)
+    sample_size = os.path.getsize(sample_path)
+    train_percent = round(inputs['train_size'] * 100, 2)
+    sample_dataframe = result['sample_df']
+
+    print_result_info = (
+        'Software Version:\t' + SDB_GUI_VERSION + '\n\n' +
+        'Image Input:\t\t' + image_path + ' (' +
+        str(round(img_size / 2**20, 2)) + ' MB)\n' +
+        'Sample Data:\t\t' + sample_path + ' (' +
+        str(round(sample_size / 2**20, 2)) + ' MB)\n\n' +
+        limit_info(inputs) + '\n' +
+        'Used Sample:\t\t' + str(sample_dataframe.shape[0]) + ' points (' +
+        str(round(sample_dataframe.shape[0] / total_points(sample_raw) * 100, 2)) +
+        '% of all sample)\n' +
+        'Train Data:\t\t' + str(result['train'].shape[0]) + ' points (' +
+        str(train_percent) + ' % of used sample)\n' +
+        'Test Data:\t\t' + str(result['test'].shape[0]) + ' points (' +
+        str(round(100 - train_percent, 2)) + ' % of used sample)\n' +
+        split_info(proc_op_dict) +
+        thinning_info(proc_op_dict, result) + '\n' +
+        'Method:\t\t' + inputs['method'] + '\n' +
+        result['parameters_info'] + '\n\n' +
+        print_tuning_info +
+        'RMSE:\t\t' + str(result['rmse']) + '\n' +
+        'MAE:\t\t' + str(result['mae']) + '\n' +
+        'R\u00B2:\t\t' + str(result['r2']) + '\n\n' +
+        'Parallel Backend:\t' + str(proc_op_dict['backend']) + '\n' +
+        'Processing Cores:\t' + str(proc_op_dict['n_jobs']) + '\n' +
+        'Random State:\t\t' + str(proc_op_dict['random_state']) + '\n'
+        'Auto Negative Sign:\t' + auto_negative + '\n' +
+        prediction_info(proc_op_dict, result) + '\n' +
+        'Model Cache:\t\t' + result['model_cache'] + '\n\n' +
+        'Reproject Runtime:\t' + str(runtime[0]) + '\n' +
+        'Filtering Runtime:\t' + str(runtime[1]) + '\n' +
+        'Sampling Runtime:\t' + str(runtime[2]) + '\n' +
+        tuning_runtime +
+        'Fitting Runtime:\t\t' + str(runtime[3]) + '\n' +
+        'Prediction Runtime:\t' + str(runtime[4]) + '\n' +
+        'Validating Runtime:\t' + str(runtime[5]) + '\n' +
+        'Overall Runtime:\t' + str(runtime[6]) + '\n\n' +
+        image_info(image_raw)
+    )
+
+    return print_result_info
+
+
+def predict_only_info(image_path, model_path, image_raw, options, result, time_list):
+    '''
+    Creating result information text of a prediction using
+    a saved model for the result text browser and the report
+    '''
+
+    metadata = result['model_metadata']
+    runtime = runtimes(time_list)
+
+    img_size = os.path.getsize(image_path)
+    model_size = os.path.getsize(model_path)
+
+    print_result_info = (
+        'Software Version:\t' + SDB_GUI_VERSION + '\n\n' +
+        'Image Input:\t\t' + image_path + ' (' +
+        str(round(img_size / 2**20, 2)) + ' MB)\n' +
+        'Model Input:\t\t' + model_path + ' (' +
+        str(round(model_size / 2**20, 2)) + ' MB)\n' +
+        'Model Trained On:\t' + metadata['image'] + '\n\n' +
+        limit_info(metadata['inputs']) + '\n\n' +
+        'Method:\t\t' + metadata['method'] + '\n' +
+        metadata['parameters_info'] + '\n\n'
+        'Model RMSE:\t\t' + str(metadata['rmse']) + '\n' +
+        'Model MAE:\t\t' + str(metadata['mae']) + '\n' +
+        'Model R\u00B2:\t\t' + str(metadata['r2']) + '\n\n' +
+        'Parallel Backend:\t' + str(options['proc']['backend']) + '\n' +
+        'Processing Cores:\t' + str(options['proc']['n_jobs']) + '\n' +
+        prediction_info(options['proc'], result) + '\n\n' +
+        'Loading Runtime:\t' + str(runtime[0]) + '\n' +
+        'Prediction Runtime:\t' + str(runtime[1]) + '\n' +
+        'Overall Runtime:\t' + str(runtime[2]) + '\n\n' +
+        image_info(image_raw)
+    )
+
+    return print_result_info
+
+
+def halo_window(window, halo, height, width):
+    '''
+    Window grown by halo pixels on every side (clipped to the raster) and
+    the padding still needed on each side where the raster ends
+    '''
+
+    row_start = max(0, window.row_off - halo)
+    col_start = max(0, window.col_off - halo)
+    row_stop = min(height, window.row_off + window.height + halo)
+    col_stop = min(width, window.col_off + window.width + halo)
+
+    read_window = Window(col_start, row_start, col_stop - col_start, row_stop - row_start)
+    pad_width = (
+        (halo - (window.row_off - row_start), halo - (row_stop - window.row_off - window.height)),
+        (halo - (window.col_off - col_start), halo - (col_stop - window.col_off - window.width))
+    )
+
+    return read_window, pad_width
+
+
+def nan_median_filter(padded, size):
+    '''
+    Median filter of an array padded by size // 2 pixels on every side,
+    returning the unpadded part. No data (NaN) pixels are ignored in the
+    median of their neighbours and stay no data, so land and masked pixels
+    never bleed into water. Without no data, the result is the same as
+    scipy.ndimage.median_filter.
+    '''
+
+    halo = size // 2
+    inner = (slice(halo, padded.shape[0] - halo), slice(halo, padded.shape[1] - halo))
+
+    if not np.isnan(padded).any():
+        from scipy import ndimage
+
+        return ndimage.median_filter(padded, size=size)[inner]
+
+    # With an even size, windows start size // 2 pixels before their
+    # pixel like in scipy, which leaves one extra window on each axis
+    windows = sliding_window_view(padded, (size, size))[
+        :padded.shape[0] - 2 * halo, :padded.shape[1] - 2 * halo
+    ]
+    z_filtered = np.empty(windows.shape[:2], dtype=padded.dtype)
+
+    # Limit the copy made by nanmedian to about 4 million values
+    chunk_rows = max(1, 2**22 // (windows.shape[1] * size * size))
+
+    with warnings.catch_warnings():
+        # All NaN windows are no data pixels, they are set to NaN below
+        warnings.simplefilter('ignore', RuntimeWarning)
+        for row in range(0, z_filtered.shape[0], chunk_rows):
+            if size % 2 == 0:
+                # Upper of the two middle values, like scipy
+                z_filtered[row:row + chunk_rows] = np.nanquantile(
+                    windows[row:row + chunk_rows], .5, axis=(2, 3), method='higher'
+                )
+            else:
+                z_filtered[row:row + chunk_rows] = np.nanmedian(
+                    windows[row:row + chunk_rows], axis=(2, 3)
+                )
+
+    z_filtered[np.isnan(padded[inner])] = np.nan
+
+    return z_filtered
+
+
+def dem_blocks(result, image_raw, dtype, filter_size, windows, n_jobs=1, cancel=None):
+    '''
+    Yielding each window and its predicted depth array in dtype, reading
+    a tiled prediction window by window from its temporary raster.
+    Median filter (if filter_size is not None) is applied to each window
+    and its halo of neighbouring pixels on a pool of n_jobs threads, so
+    only a few windows are in memory at once. cancel is checked before
+    every window.
+    '''
+
+    if result['z_predict_path'] is None:
+        predict_raw = None
+        z_img_ar = result['z_predict'].reshape(image_raw.height, image_raw.width)
+    else:
+        predict_raw = rio.open(result['z_predict_path'])
+        z_img_ar = None
+
+    read_lock = threading.Lock()
+
+    def read_window(window):
+        if predict_raw is None:
+            return z_img_ar[window.toslices()]
+        # Rasterio datasets can't be read from several threads at once
+        with read_lock:
+            return predict_raw.read(1, window=window)
+
+    def filter_window(window):
+        halo = filter_size // 2
+        halo_read, pad_width = halo_window(window, halo, image_raw.height, image_raw.width)
+        # Reflect at the raster edges like scipy.ndimage.median_filter
+        padded = np.pad(read_window(halo_read), pad_width, mode='symmetric')
+        return nan_median_filter(padded, filter_size)
+
+    try:
+        if filter_size is None:
+            for window in windows:
+                check_cancel(cancel)
+                yield window, read_window(window).astype(dtype, copy=False)
+        else:
+            workers = joblib.effective_n_jobs(n_jobs)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                pending = deque()
+                for window in windows:
+                    check_cancel(cancel)
+                    pending.append((window, executor.submit(filter_window, window)))
+                    if len(pending) >= 2 * workers:
+                        done_window, future = pending.popleft()
+                        yield done_window, future.result().astype(dtype, copy=False)
+
+                while len(pending) > 0:
+                    check_cancel(cancel)
+                    done_window, future = pending.popleft()
+                    yield done_window, future.result().astype(dtype, copy=False)
+    finally:
+        if predict_raw is not None:
+            predict_raw.close()
+
+
+def filter_info(filter_size, dtype):
+    '''
+    Median filter and output data type lines of DEM output info
+    '''
+
+    if filter_size is not None:
+        print_filter_info = (
+            'Median Filter Size:\t' + str(filter_size)
+        )
+    else:
+        print_filter_info = (
+            'Median Filter Size:\tDisabled'
+        )
+
+    return print_filter_info + '\n' + 'Output Data Type:\t' + dtype + '\n\n'
+
+
+def overview_factors(height, width, block_size):
+    '''
+    Overview decimation factors (2, 4, 8, ...) until the overview
+    fits into one block
+    '''
+
+    factors = []
+    factor = 2
+    while max(height, width) / factor >= block_size / 2:
+        factors.append(factor)
+        factor *= 2
+
+    return factors
+
+
+def save_dem(result, image_raw, save_path, driver, dtype, filter_size, tile_size,
+             xyz_options=None, tiff_options=None, n_jobs=1, cancel=None):
+    '''
+    Saving predicted depth into a raster file window by window and applying
+    median filter (if filter_size is not None) on n_jobs threads before
+    saving. GeoTIFF is written using the profile and overviews of
+    tiff_options and ASCII XYZ is written by save_xyz using xyz_options.
+    The unfinished file is removed when cancelled or failed. Returns DEM
+    output info.
+    '''
+
+    if driver == 'XYZ':
+        return save_xyz(
+            result, image_raw, save_path, dtype, filter_size, tile_size,
+            n_jobs=n_jobs, cancel=cancel, **(xyz_options or {})
+        )
+
+    tiff_options = tiff_options or {}
+    profile_name = tiff_options.get('profile', 'Uncompressed')
+    profile = {}
+    if driver == 'GTiff':
+        profile = dict(TIFF_PROFILE_DICT[profile_name])
+    cog = profile.pop('cog', False)
+    overviews = (tiff_options.get('overviews', False) or cog) and driver == 'GTiff'
+
+    if cog == True:
+        # Cloud Optimized GeoTIFF can't be written window by window,
+        # so it's copied from a tiled GeoTIFF with overviews
+        temp_file, write_path = tempfile.mkstemp(prefix='sdb_cog_', suffix='.tif')
+        os.close(temp_file)
+    else:
+        write_path = save_path
+
+    try:
+        new_img = rio.open(
+            write_path,
+            'w',
+            driver=driver,
+            height=image_raw.height,
+            width=image_raw.width,
+            count=1,
+            dtype=dtype,
+            crs=image_raw.crs,
+            transform=image_raw.transform,
+            **profile
+        )
+
+        try:
+            windows = tile_windows(image_raw.height, image_raw.width, tile_size)
+            for window, z_block in dem_blocks(
+                result, image_raw, dtype, filter_size, windows, n_jobs, cancel
+            ):
+                new_img.write(z_block, 1, window=window)
+
+            if overviews == True:
+                check_cancel(cancel)
+                new_img.build_overviews(
+                    overview_factors(
+                        image_raw.height, image_raw.width, profile.get('blockxsize', 512)
+                    ),
+                    Resampling.average
+                )
+                new_img.update_tags(ns='rio_overview', resampling='average')
+        finally:
+            new_img.close()
+
+        if cog == True:
+            check_cancel(cancel)
+            rasterio.shutil.copy(
+                write_path,
+                save_path,
+                driver='COG',
+                compress=profile['compress'],
+                predictor=profile['predictor'],
+                blocksize=profile['blockxsize'],
+                overview_resampling='average'
+            )
+    except BaseException:
+        # Partial output of a cancelled or failed save isn't left behind,
+        # temporary file of COG is removed below
+        if os.path.exists(save_path):
+            os.remove(save_path)
+        raise
+    finally:
+        if cog == True and os.path.exists(write_path):
+            os.remove(write_path)
+
+    if driver == 'GTiff':
+        print_profile_info = 'GeoTIFF Profile:\t' + profile_name
+        if overviews == True:
+            print_profile_info = print_profile_info + ' (with Overviews)'
+        print_profile_info = print_profile_info + '\n'
+    else:
+        print_profile_info = ''
+
+    new_img_size = os.path.getsize(save_path)
+    print_dem_info = (
+        filter_info(filter_size, dtype) +
+        print_profile_info +
+        'DEM Output:\t\t' + save_path + ' (' +
+        str(round(new_img_size / 2**10 / 2**10, 2)) + ' MB)\n'
+    )
+
+    return print_dem_info
+
+
+def save_xyz(result, image_raw, save_path, dtype, filter_size, tile_size,
+             drop_nan=True, precision=3, compress=False, n_jobs=1, cancel=None):
+    '''
+    Streaming predicted depth into an ASCII XYZ file (x y z of pixel
+    centres, one pixel per line) block of rows by block of rows, optionally
+    skipping no data pixels and gzipped on the fly (.gz is appended to
+    save_path). The unfinished file is removed when cancelled or failed.
+    Returns DEM output info.
+    '''
+
+    if compress == True and not save_path.endswith('.gz'):
+        save_path = save_path + '.gz'
+
+    transform = image_raw.transform
+    col_center = np.arange(image_raw.width) + 0.5
+    z_format = '%.' + str(precision) + 'f'
+    point_count = 0
+
+    if compress == True:
+        xyz_file = gzip.open(save_path, 'wt', compresslevel=6)
+    else:
+        xyz_file = open(save_path, 'w')
+
+    try:
+        windows = row_windows(image_raw.height, image_raw.width, tile_size)
+        for window, z_block in dem_blocks(
+            result, image_raw, dtype, filter_size, windows, n_jobs, cancel
+        ):
+            row_center = np.arange(window.row_off, window.row_off + window.height) + 0.5
+
+            x_block = (
+                transform.a * col_center[np.newaxis, :] +
+                transform.b * row_center[:, np.newaxis] + transform.c
+            )
+            y_block = (
+                transform.d * col_center[np.newaxis, :] +
+                transform.e * row_center[:, np.newaxis] + transform.f
+            )
+            xyz_block = np.column_stack([x_block.ravel(), y_block.ravel(), z_block.ravel()])
+
+            if drop_nan == True:
+                xyz_block = xyz_block[~np.isnan(xyz_block[:, 2])]
+
+            np.savetxt(xyz_file, xyz_block, fmt=['%.10g', '%.10g', z_format])
+            point_count += xyz_block.shape[0]
+    except BaseException:
+        xyz_file.close()
+        os.remove(save_path)
+        raise
+    finally:
+        xyz_file.close()
+
+    if drop_nan == True:
+        print_nan_info = 'Skipped'
+    else:
+        print_nan_info = 'Written as nan'
+
+    new_img_size = os.path.getsize(save_path)
+    print_dem_info = (
+        filter_info(filter_size, dtype) +
+        'XYZ Decimal Places:\t' + str(precision) + '\n' +
+        'XYZ No Data:\t\t' + print_nan_info + '\n' +
+        'XYZ Points:\t\t' + str(point_count) + '\n\n' +
+        'DEM Output:\t\t' + save_path + ' (' +
+        str(round(new_img_size / 2**10 / 2**10, 2)) + ' MB)\n'
+    )
+
+    return print_dem_info
+
+
+def save_train_test(result, crs, save_path, file_format):
+    '''
+    Saving training and testing data next to save_path in CSV (.csv)
+    or ESRI Shapefile (.shp) format. Returns train and test output info.
+    '''
+
+    train_data_df, test_data_df = result['train'], result['test']
+
+    train_save_loc = (
+        os.path.splitext(save_path)[0] +
+        '_train' + file_format
+    )
+    test_save_loc = (
+        os.path.splitext(save_path)[0] +
+        '_test' + file_format
+    )
+
+    if file_format == '.csv':
+        train_data_df.to_csv(train_save_loc, index=False)
+        test_data_df.to_csv(test_save_loc, index=False)
+    elif file_format == '.shp':
+        import geopandas as gpd
+
+        train_data_gdf = gpd.GeoDataFrame(
+            train_data_df.copy(),
+            geometry=gpd.points_from_xy(
+                train_data_df.x,
+                train_data_df.y,
+                train_data_df.z
+            ),
+            crs=crs
+        )
+        test_data_gdf = gpd.GeoDataFrame(
+            test_data_df.copy(),
+            geometry=gpd.points_from_xy(
+                test_data_df.x,
+                test_data_df.y,
+                test_data_df.z
+            ),
+            crs=crs
+        )
+
+        train_data_gdf.to_file(train_save_loc)
+        test_data_gdf.to_file(test_save_loc)
+
+    train_data_size = os.path.getsize(train_save_loc)
+    test_data_size = os.path.getsize(test_save_loc)
+
+    print_train_test_info = (
+        'Train Data Output:\t' + train_save_loc + ' (' +
+        str(round(train_data_size / 2**10 / 2**10, 2)) + ' MB)\n'
+        'Test Data output:\t' + test_save_loc + ' (' +
+        str(round(test_data_size / 2**10 / 2**10, 2)) + ' MB)\n'
+    )
+
+    return print_train_test_info
+
+
+def save_report(save_path, report_text):
+    '''
+    Saving report text next to save_path
+    '''
+
+    report_save_loc = (
+        os.path.splitext(save_path)[0] +
+        '_report.txt'
+    )
+
+    with open(report_save_loc, 'w') as report:
+        report.write(report_text)
+
+    return report_save_loc
+
+
+def save_profile(save_path, profile):
+    '''
+    Saving profile of a processing run as JSON next to save_path
+    '''
+
+    profile_save_loc = (
+        os.path.splitext(save_path)[0] +
+        '_profile.json'
+    )
+
+    with open(profile_save_loc, 'w') as profile_file:
+        json.dump(profile, profile_file, indent=4)
+
+    return profile_save_loc
+
+
+def save_outputs(result, image_raw, save_path, dem_options=None, train_test_format=None,
+                 metadata=None, report_text=None, callback=None, cancel=None):
+    '''
+    Saving DEM (save_dem keyword arguments in dem_options), training and
+    testing data (in train_test_format) and model (with metadata) next to
+    save_path at the same time on separate threads, then the report
+    (report_text followed by output info) and the run profile (if any)
+    once they are done. None means
+    not saved. callback receives the text of each saved output and
+    cancel (JobControl) pauses or stops the DEM writer between windows.
+    A cancelled or failed DEM is removed and the report isn't written, but
+    training and testing data and model saved alongside are kept.
+    Returns output info of all outputs.
+    '''
+
+    def saved(text):
+        if callback is not None:
+            callback(text)
+
+    def dem_job():
+        print_dem_info = save_dem(
+            result=result, image_raw=image_raw, save_path=save_path,
+            cancel=cancel, **dem_options
+        )
+        saved('DEM Saved.\n')
+        return print_dem_info
+
+    def train_test_job():
+        print_train_test_info = save_train_test(
+            result=result,
+            crs=result['sample_edit'].crs,
+            save_path=save_path,
+            file_format=train_test_format
+        )
+        saved('Train and Test Data Saved.\n')
+        return print_train_test_info
+
+    def model_job():
+        print_model_info = save_model(save_path, result['regressor'], metadata)
+        saved('Model Saved.\n')
+        return print_model_info
+
+    check_cancel(cancel)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        if dem_options is not None:
+            dem_future = executor.submit(dem_job)
+        if train_test_format is not None and result.get('train') is not None:
+            train_test_future = executor.submit(train_test_job)
+        if metadata is not None and 'regressor' in result:
+            model_future = executor.submit(model_job)
+
+    if dem_options is not None:
+        print_dem_info = dem_future.result()
+    else:
+        print_dem_info = (
+            'DEM Output:\t\tNot Saved\n'
+        )
+
+    if train_test_format is not None and result.get('train') is not None:
+        print_train_test_info = train_test_future.result()
+    else:
+        print_train_test_info = (
+            'Train Data Output:\tNot Saved\n'
+            'Test Data output:\tNot Saved\n'
+        )
+
+    if metadata is not None and 'regressor' in result:
+        print_model_info = model_future.result()
+    else:
+        print_model_info = (
+            'Model Output:\t\tNot Saved\n'
+        )
+
+    print_output_info = print_dem_info + print_train_test_info + print_model_info
+
+    if report_text is not None:
+        check_cancel(cancel)
+        save_report(save_path, report_text + print_output_info)
+        if result.get('profile') is not None:
+            save_profile(save_path, result['profile'])
+        saved('Report Saved.\n')
+
+    return print_output_info
+
+
+def save_steps(result, dem_options=None, train_test_format=None, metadata=None,
+               report_text=None):
+    '''
+    Number of saved output texts save_outputs sends to callback
+    (e.g. maximum of a progress bar)
+    '''
+
+    steps = 0
+    if dem_options is not None:
+        steps += 1
+    if train_test_format is not None and result.get('train') is not None:
+        steps += 1
+    if metadata is not None and 'regressor' in result:
+        steps += 1
+    if report_text is not None:
+        steps += 1
+
+    return steps
+
+
+def remove_prediction(result):
+    '''
+    Removing temporary prediction raster of a tiled prediction (if any)
+    '''
+
+    if result is not None and result.get('z_predict_path') is not None:
+        try:
+            os.remove(result['z_predict_path'])
+        except OSError:
+            pass
@@ -27,47 +27,48 @@ SOFTWARE.
 
 from glob import iglob
 from numpy.core.fromnumeric import shape
-from sklearn import metrics
-from sklearn.neighbors import KNeighborsRegressor
-from sklearn.linear_model import LinearRegression
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.svm import SVR
-from sklearn.model_selection import train_test_split
-from joblib import parallel_backend
-from scipy import ndimage
-import pandas as pd
-import numpy as np
-import geopandas as gpd
 import rasterio as rio
 from pathlib import Path
 import sys, os
 import datetime
+import json
+import threading
 import webbrowser
-from PyQt5.QtCore import (Qt, QThread, pyqtSignal)
+from sdb_core import (SDB_GUI_VERSION, PROGRESS_STEP, PREDICT_ONLY_STEP, TIFF_PROFILE_DICT,
+                      EARLY_STOPPING_DICT, APPROXIMATION_DICT, SOLVER_DICT, Cancelled,
+                      JobControl, warm_up, default_options, read_sample, load_sample,
+                      process_steps, process, predict_only, result_info, predict_only_info,
+                      model_metadata, save_outputs, save_steps, remove_prediction)
+from PyQt5.QtCore import (Qt, QThread, pyqtSignal, QAbstractTableModel, QModelIndex)
 from PyQt5.QtWidgets import(QApplication, QWidget, QTextBrowser, QProgressBar, QFileDialog, QDialog,
                             QGridLayout, QPushButton, QVBoxLayout, QComboBox, QLabel, QCheckBox,
-                            QDoubleSpinBox, QSpinBox, QTableWidgetItem, QTableWidget, QScrollArea,
-                            QErrorMessage)
+                            QDoubleSpinBox, QSpinBox, QTableView, QScrollArea, QErrorMessage,
+                            QTextEdit)
 from PyQt5.QtGui import QIcon
 
 ###############################################################################
 #################### For Auto PY to EXE or PyInstaller Use ####################
 
-import sklearn.utils._weight_vector
-import fiona._shim
-import fiona.schema
-import rasterio._features
-import rasterio._shim
-import rasterio.control
-import rasterio.crs
-import rasterio.sample
-import rasterio.vrt
+def hidden_imports():
+    '''
+    Modules Auto PY to EXE or PyInstaller can't find by itself. They are
+    imported by the warm up thread instead of at start, so the window
+    shows up without waiting for them.
+    '''
+
+    import sklearn.utils._weight_vector
+    import fiona._shim
+    import fiona.schema
+    import rasterio._features
+    import rasterio._shim
+    import rasterio.control
+    import rasterio.crs
+    import rasterio.sample
+    import rasterio.vrt
 
 ###############################################################################
 ###############################################################################
 
-SDB_GUI_VERSION = '3.3.1'
-
 def resource_path(relative_path):
     '''Get the absolute path to the resource, works for dev and for PyInstaller'''
     try:
@@ -79,6 +80,68 @@ def resource_path(relative_path):
 
 
 
+class SampleTableModel(QAbstractTableModel):
+    '''
+    Table model of the loaded depth sample. The view asks only for the
+    cells it shows, so even a sample of millions of points is shown
+    right away without creating an item for every cell.
+    '''
+
+    def __init__(self):
+
+        super(SampleTableModel, self).__init__()
+        self.columns = []
+        self.values = []
+        self.row_count = 0
+
+
+    def setFrame(self, data):
+        '''
+        Showing a DataFrame (or GeoDataFrame) in the table, or nothing if None
+        '''
+
+        self.beginResetModel()
+
+        if data is None:
+            self.columns, self.values, self.row_count = [], [], 0
+        else:
+            self.columns = [str(column) for column in data.columns]
+            self.values = [data[column].to_numpy() for column in data.columns]
+            self.row_count = len(data.index)
+
+        self.endResetModel()
+
+
+    def rowCount(self, parent=QModelIndex()):
+
+        return 0 if parent.isValid() else self.row_count
+
+
+    def columnCount(self, parent=QModelIndex()):
+
+        return 0 if parent.isValid() else len(self.columns)
+
+
+    def data(self, index, role=Qt.DisplayRole):
+
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+
+        return str(self.values[index.column()][index.row()])
+
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+
+        if role != Qt.DisplayRole:
+            return None
+
+        if orientation == Qt.Horizontal:
+            return self.columns[section]
+
+        return str(section + 1)
+
+
+
 class SDBWidget(QWidget):
     '''
     PyQt5 widget of SDB GUI
@@ -99,56 +162,46 @@ class SDBWidget(QWidget):
             'K-Nearest Neighbors': self.knnOptionWindow,
             'Multiple Linear Regression': self.mlrOptionWindow,
             'Random Forest': self.rfOptionWindow, 
-            'Support Vector Machines': self.svmOptionWindow
+            'Support Vector Machines': self.svmOptionWindow,
+            'SVM (approximate)': self.svmaOptionWindow,
+            'Histogram Gradient Boosting': self.hgbOptionWindow
         }
 
         self.dir_path = os.path.abspath(Path.home())
 
+        op_dict = default_options()
+
         global proc_op_dict
-        proc_op_dict = {
-            'backend': 'threading',
-            'n_jobs': -2,
-            'random_state': 0,
-            'auto_negative': True,
-            'exclude_outside': True
-        }
+        proc_op_dict = op_dict['proc']
 
         global knn_op_dict
-        knn_op_dict = {
-            'n_neighbors': 5,
-            'weights': 'distance',
-            'algorithm': 'auto',
-            'leaf_size': 30
-        }
+        knn_op_dict = op_dict['knn']
 
         global mlr_op_dict
-        mlr_op_dict = {
-            'fit_intercept': True,
-            'normalize': False,
-            'copy_x': True
-        }
+        mlr_op_dict = op_dict['mlr']
 
         global rf_op_dict
-        rf_op_dict = {
-            'n_estimators': 300,
-            'criterion': 'mse',
-            'bootstrap': True,
-            'random_state': 0
-        }
+        rf_op_dict = op_dict['rf']
 
         global svm_op_dict
-        svm_op_dict = {
-            'kernel': 'rbf',
-            'gamma': .1,
-            'c': 1000.0,
-            'degree': 3
-        }
+        svm_op_dict = op_dict['svm']
+
+        global svma_op_dict
+        svma_op_dict = op_dict['svma']
 
-        global val_if_nan
-        val_if_nan = -999.0
+        global hgb_op_dict
+        hgb_op_dict = op_dict['hgb']
+
+        global tune_op_dict
+        tune_op_dict = op_dict['tune']
 
         global progress_step
-        progress_step = 7
+        progress_step = PROGRESS_STEP
+
+        self.sample_path = None
+        self.sdbProcess = None
+        self.sdbSave = None
+        self.job_control = JobControl()
 
         ####### Default Values #######
 
@@ -179,7 +232,9 @@ class SDBWidget(QWidget):
         depthHeaderLabel = QLabel('Depth Header:')
         self.depthHeaderCB = QComboBox()
 
-        self.table = QTableWidget()
+        self.sampleModel = SampleTableModel()
+        self.table = QTableView()
+        self.table.setModel(self.sampleModel)
         scroll = QScrollArea()
         scroll.setWidget(self.table)
 
@@ -228,12 +283,17 @@ class SDBWidget(QWidget):
 
         makePredictionButton = QPushButton('Make Prediction')
         makePredictionButton.clicked.connect(self.predict)
+        predictModelButton = QPushButton('Predict Using Model')
+        predictModelButton.clicked.connect(self.predictModelWindow)
         saveFileButton = QPushButton('Save Into File')
         saveFileButton.clicked.connect(self.saveOptionWindow)
 
         processingOptionsButton = QPushButton('Processing Options')
         processingOptionsButton.clicked.connect(self.processingOptionWindow)
 
+        tuningOptionsButton = QPushButton('Tuning Options')
+        tuningOptionsButton.clicked.connect(self.tuningOptionWindow)
+
         resultInfo = QLabel('Result Information')
         self.resultText = QTextBrowser()
         self.resultText.setAlignment(Qt.AlignRight)
@@ -243,6 +303,14 @@ class SDBWidget(QWidget):
         self.progressBar.setMinimum(0)
         self.progressBar.setMaximum(progress_step)
 
+        self.pauseButton = QPushButton('Pause')
+        self.pauseButton.clicked.connect(self.pauseAction)
+        self.pauseButton.setEnabled(False)
+
+        self.cancelButton = QPushButton('Cancel')
+        self.cancelButton.clicked.connect(self.cancelAction)
+        self.cancelButton.setEnabled(False)
+
         releaseButton =  QPushButton('Releases')
         releaseButton.clicked.connect(lambda: webbrowser.open(
             'https://github.com/rifqiharrys/sdb_gui/releases'
@@ -286,9 +354,11 @@ class SDBWidget(QWidget):
         grid.addWidget(trainPercentLabel, 13, 1, 1, 1)
         grid.addWidget(self.trainPercentDSB, 13, 2, 1, 1)
 
-        grid.addWidget(processingOptionsButton, 13, 3, 1, 2)
+        grid.addWidget(processingOptionsButton, 13, 3, 1, 1)
+        grid.addWidget(tuningOptionsButton, 13, 4, 1, 1)
 
-        grid.addWidget(makePredictionButton, 14, 1, 1, 2)
+        grid.addWidget(makePredictionButton, 14, 1, 1, 1)
+        grid.addWidget(predictModelButton, 14, 2, 1, 1)
         grid.addWidget(saveFileButton, 14, 3, 1, 2)
 
         grid.addWidget(resultInfo, 15, 1, 1, 2)
@@ -297,7 +367,9 @@ class SDBWidget(QWidget):
         vbox.addStretch(1)
         grid.addLayout(vbox, 21, 1)
 
-        grid.addWidget(self.progressBar, 22, 1, 1, 4)
+        grid.addWidget(self.progressBar, 22, 1, 1, 2)
+        grid.addWidget(self.pauseButton, 22, 3, 1, 1)
+        grid.addWidget(self.cancelButton, 22, 4, 1, 1)
 
         grid.addWidget(releaseButton, 23, 1, 1, 1)
         grid.addWidget(licensesButton, 23, 2, 1, 2)
@@ -382,8 +454,8 @@ class SDBWidget(QWidget):
     def loadImageAction(self):
         '''
         Loading selected image and retrieve some metadata such as file size,
-        band quantity, array size, pixel size, etc. Then, recreate image 3D
-        array into a simple column and row array.
+        band quantity, array size, pixel size, etc. The bands are not read
+        into memory until they are needed for sampling or prediction.
         '''
 
         try:
@@ -391,20 +463,14 @@ class SDBWidget(QWidget):
             img_size = os.path.getsize(self.imglocList.toPlainText())
 
             global image_raw
-            image_raw = rio.open(self.imglocList.toPlainText())
-
-            nbands = len(image_raw.indexes)
-            ndata = image_raw.read(1).size
-            bands_dummy = np.empty((nbands, ndata))
+            # Close previously loaded image (if any)
+            try:
+                image_raw.close()
+            except NameError:
+                pass
 
-            for i in image_raw.indexes:
-                bands_dummy[i - 1, :] = np.ravel(image_raw.read(i))
-
-            global bands_array
-            bands_array = bands_dummy.T
-            # Change missing value (if any) to val_if_nan variable
-            nan_values = np.isnan(bands_array)
-            bands_array[nan_values] = val_if_nan
+            # Bands stay on disk and are read window by window when needed
+            image_raw = rio.open(self.imglocList.toPlainText())
 
             self.loadImageLabel.setText(
                 os.path.split(self.imglocList.toPlainText())[1]
@@ -432,7 +498,7 @@ class SDBWidget(QWidget):
             lambda: self.fileDialog(
                 command=QFileDialog.getOpenFileName,
                 window_text='Open Depth Sample File',
-                file_type='ESRI Shapefile (*.shp)',
+                file_type='Depth Sample (*.shp *.gpkg *.parquet *.geoparquet *.csv *.txt *.xyz)',
                 text_browser=self.samplelocList
             )
         )
@@ -469,24 +535,38 @@ class SDBWidget(QWidget):
         '''
         Loading selected sample and retrieve file size.
         Then, some or all data on selected sample to the widget.
+        Unless all data are shown, only the first rows are read here and
+        the whole sample (geometry and depth column only) is read when
+        processing starts.
         '''
 
         try:
             global sample_size
             sample_size = os.path.getsize(self.samplelocList.toPlainText())
 
+            global sample_preview
             global sample_raw
-            sample_raw = gpd.read_file(self.samplelocList.toPlainText())
+            global sample_key
+            if self.showCheckBox.isChecked() == True:
+                sample_preview = read_sample(self.samplelocList.toPlainText())
+                sample_raw = sample_preview
+                sample_key = (self.samplelocList.toPlainText(), None)
+            else:
+                sample_preview = read_sample(self.samplelocList.toPlainText(), rows=100)
+                sample_raw = None
+                sample_key = None
+            self.sample_path = self.samplelocList.toPlainText()
 
             self.loadSampleLabel.setText(os.path.split(
                 self.samplelocList.toPlainText())[1]
             )
 
-            if (sample_raw.geom_type != 'Point').any():
-                del sample_raw
+            if (sample_preview.geom_type != 'Point').any():
+                del sample_preview
+                sample_raw = None
                 self.loadSampleLabel.setText('Sample Retracted')
                 self.depthHeaderCB.clear()
-                self.table.clearContents()
+                self.sampleModel.setFrame(None)
 
                 self.loadSampleDialog.close()
                 self.warningWithoutClear(
@@ -494,30 +574,18 @@ class SDBWidget(QWidget):
                 )
                 self.loadSampleWindow()
             else:
-                raw = sample_raw.copy()
-
-                if self.showCheckBox.isChecked() == True:
-                    data = raw
-                else:
-                    data = raw.head(100)
+                data = sample_preview
 
                 self.depthHeaderCB.clear()
                 self.depthHeaderCB.addItems(data.columns)
 
-                self.table.setColumnCount(len(data.columns))
-                self.table.setRowCount(len(data.index))
-
-                for h in range(len(data.columns)):
-                    self.table.setHorizontalHeaderItem(h, QTableWidgetItem(data.columns[h]))
-
-                for i in range(len(data.index)):
-                    for j in range(len(data.columns)):
-                        self.table.setItem(i, j, QTableWidgetItem(str(data.iloc[i, j])))
+                self.sampleModel.setFrame(data)
 
+                # Column widths are measured on the first rows only
+                # (resizeContentsPrecision), so this is fast on any size
                 self.table.resizeColumnsToContents()
-                self.table.resizeRowsToContents()
 
-                print(sample_raw.crs)
+                print(sample_preview.crs)
         except:
             self.loadSampleDialog.close()
             self.warningWithClear(
@@ -798,6 +866,238 @@ class SDBWidget(QWidget):
         svm_op_dict['degree'] = self.degreeSB.value()
 
 
+    def svmaOptionWindow(self):
+        '''
+        Approximate Support Vector Machine option User Interface
+        '''
+
+        optionDialog = QDialog()
+        optionDialog.setWindowTitle('Options (SVM Approximate)')
+        optionDialog.setWindowIcon(QIcon(resource_path('icons/setting-tool-pngrepo-com.png')))
+
+        self.approximation_dict = {v: k for k, v in APPROXIMATION_DICT.items()}
+        self.solver_dict = {v: k for k, v in SOLVER_DICT.items()}
+
+        approximationLabel = QLabel('Kernel Approximation:')
+        self.approximationCB = QComboBox()
+        self.approximationCB.addItems(list(self.approximation_dict))
+        self.approximationCB.setCurrentText(APPROXIMATION_DICT[svma_op_dict['approximation']])
+
+        gammaLabel = QLabel('Gamma (RBF):')
+        self.gammaApproxDSB = QDoubleSpinBox()
+        self.gammaApproxDSB.setRange(.001, 10)
+        self.gammaApproxDSB.setDecimals(3)
+        self.gammaApproxDSB.setValue(svma_op_dict['gamma'])
+        self.gammaApproxDSB.setAlignment(Qt.AlignRight)
+
+        componentsLabel = QLabel('Components:')
+        self.componentsSB = QSpinBox()
+        self.componentsSB.setRange(10, 10000)
+        self.componentsSB.setSingleStep(100)
+        self.componentsSB.setValue(svma_op_dict['n_components'])
+        self.componentsSB.setAlignment(Qt.AlignRight)
+
+        solverLabel = QLabel('Linear Solver:')
+        self.solverCB = QComboBox()
+        self.solverCB.addItems(list(self.solver_dict))
+        self.solverCB.setCurrentText(SOLVER_DICT[svma_op_dict['solver']])
+
+        cLabel = QLabel('C:')
+        self.cApproxDSB = QDoubleSpinBox()
+        self.cApproxDSB.setRange(.001, 10000)
+        self.cApproxDSB.setDecimals(3)
+        self.cApproxDSB.setValue(svma_op_dict['c'])
+        self.cApproxDSB.setAlignment(Qt.AlignRight)
+
+        batchSizeLabel = QLabel('Prediction Batch Size:')
+        self.batchSizeSB = QSpinBox()
+        self.batchSizeSB.setRange(1000, 10000000)
+        self.batchSizeSB.setSingleStep(10000)
+        self.batchSizeSB.setValue(svma_op_dict['batch_size'])
+        self.batchSizeSB.setSuffix(' px')
+        self.batchSizeSB.setAlignment(Qt.AlignRight)
+
+        cancelButton = QPushButton('Cancel')
+        cancelButton.clicked.connect(optionDialog.close)
+        loadButton = QPushButton('Load')
+        loadButton.clicked.connect(self.loadSVMAOptionAction)
+        loadButton.clicked.connect(optionDialog.close)
+
+        grid = QGridLayout()
+
+        grid.addWidget(approximationLabel, 1, 1, 1, 2)
+        grid.addWidget(self.approximationCB, 1, 3, 1, 2)
+
+        grid.addWidget(gammaLabel, 2, 1, 1, 2)
+        grid.addWidget(self.gammaApproxDSB, 2, 3, 1, 2)
+
+        grid.addWidget(componentsLabel, 3, 1, 1, 2)
+        grid.addWidget(self.componentsSB, 3, 3, 1, 2)
+
+        grid.addWidget(solverLabel, 4, 1, 1, 2)
+        grid.addWidget(self.solverCB, 4, 3, 1, 2)
+
+        grid.addWidget(cLabel, 5, 1, 1, 2)
+        grid.addWidget(self.cApproxDSB, 5, 3, 1, 2)
+
+        grid.addWidget(batchSizeLabel, 6, 1, 1, 2)
+        grid.addWidget(self.batchSizeSB, 6, 3, 1, 2)
+
+        grid.addWidget(loadButton, 7, 3, 1, 1)
+        grid.addWidget(cancelButton, 7, 4, 1, 1)
+
+        optionDialog.setLayout(grid)
+
+        optionDialog.exec_()
+
+
+    def loadSVMAOptionAction(self):
+        '''
+        Loading defined approximate SVM option input
+        '''
+
+        svma_op_dict['approximation'] = self.approximation_dict[self.approximationCB.currentText()]
+        svma_op_dict['gamma'] = self.gammaApproxDSB.value()
+        svma_op_dict['n_components'] = self.componentsSB.value()
+        svma_op_dict['solver'] = self.solver_dict[self.solverCB.currentText()]
+        svma_op_dict['c'] = self.cApproxDSB.value()
+        svma_op_dict['batch_size'] = self.batchSizeSB.value()
+
+
+    def hgbOptionWindow(self):
+        '''
+        Histogram Gradient Boosting option User Interface
+        '''
+
+        optionDialog = QDialog()
+        optionDialog.setWindowTitle('Options (Histogram Gradient Boosting)')
+        optionDialog.setWindowIcon(QIcon(resource_path('icons/setting-tool-pngrepo-com.png')))
+
+        learningRateLabel = QLabel('Learning Rate:')
+        self.learningRateDSB = QDoubleSpinBox()
+        self.learningRateDSB.setRange(.001, 1)
+        self.learningRateDSB.setDecimals(3)
+        self.learningRateDSB.setSingleStep(.01)
+        self.learningRateDSB.setValue(hgb_op_dict['learning_rate'])
+        self.learningRateDSB.setAlignment(Qt.AlignRight)
+
+        maxIterLabel = QLabel('Max Iterations:')
+        self.maxIterSB = QSpinBox()
+        self.maxIterSB.setRange(1, 10000)
+        self.maxIterSB.setValue(hgb_op_dict['max_iter'])
+        self.maxIterSB.setAlignment(Qt.AlignRight)
+
+        maxLeafNodesLabel = QLabel('Max Leaf Nodes:')
+        self.maxLeafNodesSB = QSpinBox()
+        self.maxLeafNodesSB.setRange(2, 10000)
+        self.maxLeafNodesSB.setValue(hgb_op_dict['max_leaf_nodes'])
+        self.maxLeafNodesSB.setAlignment(Qt.AlignRight)
+
+        minSamplesLeafLabel = QLabel('Min Samples Leaf:')
+        self.minSamplesLeafSB = QSpinBox()
+        self.minSamplesLeafSB.setRange(1, 10000)
+        self.minSamplesLeafSB.setValue(hgb_op_dict['min_samples_leaf'])
+        self.minSamplesLeafSB.setAlignment(Qt.AlignRight)
+
+        l2Label = QLabel('L2 Regularization:')
+        self.l2DSB = QDoubleSpinBox()
+        self.l2DSB.setRange(0, 1000)
+        self.l2DSB.setDecimals(3)
+        self.l2DSB.setValue(hgb_op_dict['l2_regularization'])
+        self.l2DSB.setAlignment(Qt.AlignRight)
+
+        earlyStoppingLabel = QLabel('Early Stopping:')
+        self.earlyStoppingCB = QComboBox()
+        self.earlyStoppingCB.addItems(list(EARLY_STOPPING_DICT))
+        self.earlyStoppingCB.setCurrentText(
+            {v: k for k, v in EARLY_STOPPING_DICT.items()}[hgb_op_dict['early_stopping']]
+        )
+
+        validationFractionLabel = QLabel('Validation Fraction:')
+        self.validationFractionDSB = QDoubleSpinBox()
+        self.validationFractionDSB.setRange(.01, .5)
+        self.validationFractionDSB.setDecimals(2)
+        self.validationFractionDSB.setSingleStep(.05)
+        self.validationFractionDSB.setValue(hgb_op_dict['validation_fraction'])
+        self.validationFractionDSB.setAlignment(Qt.AlignRight)
+
+        nIterNoChangeLabel = QLabel('Iterations Without Change:')
+        self.nIterNoChangeSB = QSpinBox()
+        self.nIterNoChangeSB.setRange(1, 1000)
+        self.nIterNoChangeSB.setValue(hgb_op_dict['n_iter_no_change'])
+        self.nIterNoChangeSB.setAlignment(Qt.AlignRight)
+
+        self.missingValuesCB = QCheckBox('Use pixels with missing band values')
+        self.missingValuesCB.setChecked(hgb_op_dict['missing_values'])
+
+        randomStateLabel = QLabel('Random State:')
+        self.randomStateHGBSB = QSpinBox()
+        self.randomStateHGBSB.setRange(0, 1000)
+        self.randomStateHGBSB.setValue(hgb_op_dict['random_state'])
+        self.randomStateHGBSB.setAlignment(Qt.AlignRight)
+
+        cancelButton = QPushButton('Cancel')
+        cancelButton.clicked.connect(optionDialog.close)
+        loadButton = QPushButton('Load')
+        loadButton.clicked.connect(self.loadHGBOptionAction)
+        loadButton.clicked.connect(optionDialog.close)
+
+        grid = QGridLayout()
+
+        grid.addWidget(learningRateLabel, 1, 1, 1, 2)
+        grid.addWidget(self.learningRateDSB, 1, 3, 1, 2)
+
+        grid.addWidget(maxIterLabel, 2, 1, 1, 2)
+        grid.addWidget(self.maxIterSB, 2, 3, 1, 2)
+
+        grid.addWidget(maxLeafNodesLabel, 3, 1, 1, 2)
+        grid.addWidget(self.maxLeafNodesSB, 3, 3, 1, 2)
+
+        grid.addWidget(minSamplesLeafLabel, 4, 1, 1, 2)
+        grid.addWidget(self.minSamplesLeafSB, 4, 3, 1, 2)
+
+        grid.addWidget(l2Label, 5, 1, 1, 2)
+        grid.addWidget(self.l2DSB, 5, 3, 1, 2)
+
+        grid.addWidget(earlyStoppingLabel, 6, 1, 1, 2)
+        grid.addWidget(self.earlyStoppingCB, 6, 3, 1, 2)
+
+        grid.addWidget(validationFractionLabel, 7, 1, 1, 2)
+        grid.addWidget(self.validationFractionDSB, 7, 3, 1, 2)
+
+        grid.addWidget(nIterNoChangeLabel, 8, 1, 1, 2)
+        grid.addWidget(self.nIterNoChangeSB, 8, 3, 1, 2)
+
+        grid.addWidget(self.missingValuesCB, 9, 1, 1, 4)
+
+        grid.addWidget(randomStateLabel, 10, 1, 1, 2)
+        grid.addWidget(self.randomStateHGBSB, 10, 3, 1, 2)
+
+        grid.addWidget(loadButton, 11, 3, 1, 1)
+        grid.addWidget(cancelButton, 11, 4, 1, 1)
+
+        optionDialog.setLayout(grid)
+
+        optionDialog.exec_()
+
+
+    def loadHGBOptionAction(self):
+        '''
+        Loading defined Histogram Gradient Boosting option input
+        '''
+
+        hgb_op_dict['learning_rate'] = self.learningRateDSB.value()
+        hgb_op_dict['max_iter'] = self.maxIterSB.value()
+        hgb_op_dict['max_leaf_nodes'] = self.maxLeafNodesSB.value()
+        hgb_op_dict['min_samples_leaf'] = self.minSamplesLeafSB.value()
+        hgb_op_dict['l2_regularization'] = self.l2DSB.value()
+        hgb_op_dict['early_stopping'] = EARLY_STOPPING_DICT[self.earlyStoppingCB.currentText()]
+        hgb_op_dict['validation_fraction'] = self.validationFractionDSB.value()
+        hgb_op_dict['n_iter_no_change'] = self.nIterNoChangeSB.value()
+        hgb_op_dict['missing_values'] = self.missingValuesCB.isChecked()
+        hgb_op_dict['random_state'] = self.randomStateHGBSB.value()
+
+
     def processingOptionWindow(self):
         '''
         Processing option User Interface
@@ -824,12 +1124,140 @@ class SDBWidget(QWidget):
         self.randomStateProcSB.setValue(proc_op_dict['random_state'])
         self.randomStateProcSB.setAlignment(Qt.AlignRight)
 
+        self.split_dict = {
+            'Random': 'random',
+            'Spatial Blocks': 'block'
+        }
+
+        splitLabel = QLabel('Train Test Split:')
+        self.splitCB = QComboBox()
+        self.splitCB.addItems(list(self.split_dict))
+        self.splitCB.setCurrentText(
+            {v: k for k, v in self.split_dict.items()}[proc_op_dict['split']]
+        )
+
+        blockSizeLabel = QLabel('Block Size:')
+        self.blockSizeDSB = QDoubleSpinBox()
+        self.blockSizeDSB.setRange(.01, 1e7)
+        self.blockSizeDSB.setDecimals(2)
+        self.blockSizeDSB.setSingleStep(100)
+        self.blockSizeDSB.setValue(proc_op_dict['block_size'])
+        self.blockSizeDSB.setSuffix(' m')
+        self.blockSizeDSB.setAlignment(Qt.AlignRight)
+
+        self.thinning_dict = {
+            'Disabled': 'none',
+            'Mean Depth per Pixel': 'mean',
+            'Median Depth per Pixel': 'median'
+        }
+
+        thinningLabel = QLabel('Sample Thinning:')
+        self.thinningCB = QComboBox()
+        self.thinningCB.addItems(list(self.thinning_dict))
+        self.thinningCB.setCurrentText(
+            {v: k for k, v in self.thinning_dict.items()}[proc_op_dict['thinning']]
+        )
+
+        self.countWeightsCB = QCheckBox('Weight by point count')
+        self.countWeightsCB.setChecked(proc_op_dict['count_weights'])
+
+        maxPointsLabel = QLabel('Max Points:')
+        self.maxPointsSB = QSpinBox()
+        self.maxPointsSB.setRange(0, 1000000)
+        self.maxPointsSB.setValue(proc_op_dict['max_points'])
+        self.maxPointsSB.setSpecialValueText('No limit')
+        self.maxPointsSB.setAlignment(Qt.AlignRight)
+
+        capSizeLabel = QLabel('per Area Size:')
+        self.capSizeDSB = QDoubleSpinBox()
+        self.capSizeDSB.setRange(.01, 1e7)
+        self.capSizeDSB.setDecimals(2)
+        self.capSizeDSB.setSingleStep(100)
+        self.capSizeDSB.setValue(proc_op_dict['cap_size'])
+        self.capSizeDSB.setSuffix(' m')
+        self.capSizeDSB.setAlignment(Qt.AlignRight)
+
         self.autoNegativeCB = QCheckBox('Auto negative sign')
         self.autoNegativeCB.setChecked(proc_op_dict['auto_negative'])
 
         self.excludeOutsideCB = QCheckBox('Exclude points which out of image boundary')
         self.excludeOutsideCB.setChecked(proc_op_dict['exclude_outside'])
 
+        self.tiledPredictCB = QCheckBox('Tiled prediction')
+        self.tiledPredictCB.setChecked(proc_op_dict['tiled_predict'])
+
+        tileSizeLabel = QLabel('Tile Size:')
+        self.tileSizeSB = QSpinBox()
+        self.tileSizeSB.setRange(64, 16384)
+        self.tileSizeSB.setSingleStep(64)
+        self.tileSizeSB.setValue(proc_op_dict['tile_size'])
+        self.tileSizeSB.setSuffix(' px')
+        self.tileSizeSB.setAlignment(Qt.AlignRight)
+
+        computeTypeLabel = QLabel('Compute Data Type:')
+        self.computeTypeCB = QComboBox()
+        self.computeTypeCB.addItems(['float32', 'float64'])
+        self.computeTypeCB.setCurrentText(proc_op_dict['compute_dtype'])
+
+        self.water_mask_dict = {
+            'Disabled': 'none',
+            'Normalized Difference Index': 'index',
+            'Mask File': 'file'
+        }
+
+        waterMaskLabel = QLabel('Water Mask:')
+        self.waterMaskCB = QComboBox()
+        self.waterMaskCB.addItems(list(self.water_mask_dict))
+        self.waterMaskCB.setCurrentText(
+            {v: k for k, v in self.water_mask_dict.items()}[proc_op_dict['water_mask']]
+        )
+
+        maskBandALabel = QLabel('Band A (Green):')
+        self.maskBandASB = QSpinBox()
+        self.maskBandASB.setRange(1, 100)
+        self.maskBandASB.setValue(proc_op_dict['mask_band_a'])
+        self.maskBandASB.setAlignment(Qt.AlignRight)
+
+        maskBandBLabel = QLabel('Band B (NIR/SWIR):')
+        self.maskBandBSB = QSpinBox()
+        self.maskBandBSB.setRange(1, 100)
+        self.maskBandBSB.setValue(proc_op_dict['mask_band_b'])
+        self.maskBandBSB.setAlignment(Qt.AlignRight)
+
+        maskThresholdLabel = QLabel('Index Threshold:')
+        self.maskThresholdDSB = QDoubleSpinBox()
+        self.maskThresholdDSB.setRange(-1, 1)
+        self.maskThresholdDSB.setDecimals(2)
+        self.maskThresholdDSB.setSingleStep(.05)
+        self.maskThresholdDSB.setValue(proc_op_dict['mask_threshold'])
+        self.maskThresholdDSB.setAlignment(Qt.AlignRight)
+
+        self.masklocList = QTextBrowser()
+        self.masklocList.setFixedHeight(30)
+        if proc_op_dict['mask_path'] is not None:
+            self.masklocList.setText(proc_op_dict['mask_path'])
+
+        openMaskButton = QPushButton('Open Mask File')
+        openMaskButton.clicked.connect(
+            lambda: self.fileDialog(
+                command=QFileDialog.getOpenFileName,
+                window_text='Open Water Mask File',
+                file_type='GeoTIFF (*.tif);; ESRI Shapefile (*.shp)',
+                text_browser=self.masklocList
+            )
+        )
+
+        self.modelCacheCB = QCheckBox('Use model cache')
+        self.modelCacheCB.setChecked(proc_op_dict['model_cache'])
+
+        cacheSizeLabel = QLabel('Cache Size:')
+        self.cacheSizeSB = QSpinBox()
+        self.cacheSizeSB.setRange(16, 1000000)
+        self.cacheSizeSB.setSingleStep(256)
+        self.cacheSizeSB.setValue(proc_op_dict['cache_size'])
+        self.cacheSizeSB.setSuffix(' MB')
+        self.cacheSizeSB.setAlignment(Qt.AlignRight)
+
         cancelButton = QPushButton('Cancel')
         cancelButton.clicked.connect(self.processingOptionDialog.close)
         loadButton = QPushButton('Load')
@@ -851,8 +1279,47 @@ class SDBWidget(QWidget):
 
         grid.addWidget(self.excludeOutsideCB, 5, 1, 1, 4)
 
-        grid.addWidget(loadButton, 6, 3, 1, 1)
-        grid.addWidget(cancelButton, 6, 4, 1, 1)
+        grid.addWidget(self.tiledPredictCB, 6, 1, 1, 2)
+        grid.addWidget(tileSizeLabel, 6, 3, 1, 1)
+        grid.addWidget(self.tileSizeSB, 6, 4, 1, 1)
+
+        grid.addWidget(computeTypeLabel, 7, 1, 1, 2)
+        grid.addWidget(self.computeTypeCB, 7, 3, 1, 2)
+
+        grid.addWidget(waterMaskLabel, 8, 1, 1, 2)
+        grid.addWidget(self.waterMaskCB, 8, 3, 1, 2)
+
+        grid.addWidget(maskBandALabel, 9, 1, 1, 1)
+        grid.addWidget(self.maskBandASB, 9, 2, 1, 1)
+        grid.addWidget(maskBandBLabel, 9, 3, 1, 1)
+        grid.addWidget(self.maskBandBSB, 9, 4, 1, 1)
+
+        grid.addWidget(maskThresholdLabel, 10, 1, 1, 2)
+        grid.addWidget(self.maskThresholdDSB, 10, 3, 1, 2)
+
+        grid.addWidget(openMaskButton, 11, 1, 1, 1)
+        grid.addWidget(self.masklocList, 11, 2, 1, 3)
+
+        grid.addWidget(self.modelCacheCB, 12, 1, 1, 2)
+        grid.addWidget(cacheSizeLabel, 12, 3, 1, 1)
+        grid.addWidget(self.cacheSizeSB, 12, 4, 1, 1)
+
+        grid.addWidget(splitLabel, 13, 1, 1, 1)
+        grid.addWidget(self.splitCB, 13, 2, 1, 1)
+        grid.addWidget(blockSizeLabel, 13, 3, 1, 1)
+        grid.addWidget(self.blockSizeDSB, 13, 4, 1, 1)
+
+        grid.addWidget(thinningLabel, 14, 1, 1, 1)
+        grid.addWidget(self.thinningCB, 14, 2, 1, 1)
+        grid.addWidget(self.countWeightsCB, 14, 3, 1, 2)
+
+        grid.addWidget(maxPointsLabel, 15, 1, 1, 1)
+        grid.addWidget(self.maxPointsSB, 15, 2, 1, 1)
+        grid.addWidget(capSizeLabel, 15, 3, 1, 1)
+        grid.addWidget(self.capSizeDSB, 15, 4, 1, 1)
+
+        grid.addWidget(loadButton, 16, 3, 1, 1)
+        grid.addWidget(cancelButton, 16, 4, 1, 1)
 
         self.processingOptionDialog.setLayout(grid)
 
@@ -876,6 +1343,143 @@ class SDBWidget(QWidget):
             proc_op_dict['random_state'] = self.randomStateProcSB.value()
             proc_op_dict['auto_negative'] = self.autoNegativeCB.isChecked()
             proc_op_dict['exclude_outside'] = self.excludeOutsideCB.isChecked()
+            proc_op_dict['tiled_predict'] = self.tiledPredictCB.isChecked()
+            proc_op_dict['tile_size'] = self.tileSizeSB.value()
+            proc_op_dict['compute_dtype'] = self.computeTypeCB.currentText()
+            proc_op_dict['water_mask'] = self.water_mask_dict[self.waterMaskCB.currentText()]
+            proc_op_dict['mask_band_a'] = self.maskBandASB.value()
+            proc_op_dict['mask_band_b'] = self.maskBandBSB.value()
+            proc_op_dict['mask_threshold'] = self.maskThresholdDSB.value()
+            proc_op_dict['model_cache'] = self.modelCacheCB.isChecked()
+            proc_op_dict['cache_size'] = self.cacheSizeSB.value()
+            proc_op_dict['split'] = self.split_dict[self.splitCB.currentText()]
+            proc_op_dict['block_size'] = self.blockSizeDSB.value()
+            proc_op_dict['thinning'] = self.thinning_dict[self.thinningCB.currentText()]
+            proc_op_dict['count_weights'] = self.countWeightsCB.isChecked()
+            proc_op_dict['max_points'] = self.maxPointsSB.value()
+            proc_op_dict['cap_size'] = self.capSizeDSB.value()
+            if self.masklocList.toPlainText() != '':
+                proc_op_dict['mask_path'] = self.masklocList.toPlainText()
+
+
+    def tuningOptionWindow(self):
+        '''
+        Hyperparameter tuning option User Interface
+        '''
+
+        self.tuningOptionDialog = QDialog()
+        self.tuningOptionDialog.setWindowTitle('Tuning Options')
+        self.tuningOptionDialog.setWindowIcon(QIcon(resource_path('icons/setting-tool-pngrepo-com.png')))
+
+        self.search_dict = {
+            'Disabled': 'none',
+            'Grid Search': 'grid',
+            'Random Search': 'random',
+            'Successive Halving': 'halving'
+        }
+
+        searchLabel = QLabel('Search:')
+        self.searchCB = QComboBox()
+        self.searchCB.addItems(list(self.search_dict))
+        self.searchCB.setCurrentText(
+            {v: k for k, v in self.search_dict.items()}[tune_op_dict['search']]
+        )
+
+        self.cv_dict = {
+            'K-Fold': 'kfold',
+            'Spatial Block K-Fold': 'block'
+        }
+
+        cvLabel = QLabel('Cross Validation:')
+        self.cvCB = QComboBox()
+        self.cvCB.addItems(list(self.cv_dict))
+        self.cvCB.setCurrentText(
+            {v: k for k, v in self.cv_dict.items()}[tune_op_dict['cv']]
+        )
+
+        foldsLabel = QLabel('Folds:')
+        self.foldsSB = QSpinBox()
+        self.foldsSB.setRange(2, 20)
+        self.foldsSB.setValue(tune_op_dict['folds'])
+        self.foldsSB.setAlignment(Qt.AlignRight)
+
+        nIterLabel = QLabel('Random Candidates:')
+        self.nIterSB = QSpinBox()
+        self.nIterSB.setRange(1, 10000)
+        self.nIterSB.setValue(tune_op_dict['n_iter'])
+        self.nIterSB.setAlignment(Qt.AlignRight)
+
+        factorLabel = QLabel('Halving Factor:')
+        self.factorSB = QSpinBox()
+        self.factorSB.setRange(2, 10)
+        self.factorSB.setValue(tune_op_dict['factor'])
+        self.factorSB.setAlignment(Qt.AlignRight)
+
+        self.tuneCacheCB = QCheckBox('Cache cross validation scores (with model cache)')
+        self.tuneCacheCB.setChecked(tune_op_dict['cache'])
+
+        gridLabel = QLabel('Parameter Grid of Each Method (JSON):')
+        self.gridTE = QTextEdit()
+        self.gridTE.setAcceptRichText(False)
+        self.gridTE.setPlainText(json.dumps(tune_op_dict['grid'], indent=4))
+
+        cancelButton = QPushButton('Cancel')
+        cancelButton.clicked.connect(self.tuningOptionDialog.close)
+        loadButton = QPushButton('Load')
+        loadButton.clicked.connect(self.loadTuningOptionAction)
+        loadButton.clicked.connect(self.tuningOptionDialog.close)
+
+        grid = QGridLayout()
+
+        grid.addWidget(searchLabel, 1, 1, 1, 2)
+        grid.addWidget(self.searchCB, 1, 3, 1, 2)
+
+        grid.addWidget(cvLabel, 2, 1, 1, 1)
+        grid.addWidget(self.cvCB, 2, 2, 1, 1)
+        grid.addWidget(foldsLabel, 2, 3, 1, 1)
+        grid.addWidget(self.foldsSB, 2, 4, 1, 1)
+
+        grid.addWidget(nIterLabel, 3, 1, 1, 1)
+        grid.addWidget(self.nIterSB, 3, 2, 1, 1)
+        grid.addWidget(factorLabel, 3, 3, 1, 1)
+        grid.addWidget(self.factorSB, 3, 4, 1, 1)
+
+        grid.addWidget(self.tuneCacheCB, 4, 1, 1, 4)
+
+        grid.addWidget(gridLabel, 5, 1, 1, 4)
+        grid.addWidget(self.gridTE, 6, 1, 1, 4)
+
+        grid.addWidget(loadButton, 7, 3, 1, 1)
+        grid.addWidget(cancelButton, 7, 4, 1, 1)
+
+        self.tuningOptionDialog.setLayout(grid)
+
+        self.tuningOptionDialog.exec_()
+
+
+    def loadTuningOptionAction(self):
+        '''
+        Loading defined tuning option input
+        '''
+
+        try:
+            param_grid = json.loads(self.gridTE.toPlainText())
+            if not all(isinstance(param_grid.get(key), dict) for key in tune_op_dict['grid']):
+                raise ValueError
+        except ValueError:
+            self.tuningOptionDialog.close()
+            self.warningWithoutClear(
+                'Parameter grid is not valid JSON with a grid for every method!'
+            )
+            self.tuningOptionWindow()
+        else:
+            tune_op_dict['search'] = self.search_dict[self.searchCB.currentText()]
+            tune_op_dict['cv'] = self.cv_dict[self.cvCB.currentText()]
+            tune_op_dict['folds'] = self.foldsSB.value()
+            tune_op_dict['n_iter'] = self.nIterSB.value()
+            tune_op_dict['factor'] = self.factorSB.value()
+            tune_op_dict['cache'] = self.tuneCacheCB.isChecked()
+            tune_op_dict['grid'] = param_grid
 
 
     def predict(self):
@@ -884,8 +1488,15 @@ class SDBWidget(QWidget):
         '''
         print('widget predict')
 
+        if self.running() == True:
+            self.warningWithoutClear(
+                'Please wait until the running job is finished or cancel it!'
+            )
+            return
+
         self.resultText.clear()
         self.progressBar.setValue(0)
+        self.progressBar.setMaximum(process_steps(self.options()))
 
         if self.limitADSB.value() < self.limitBDSB.value():
             a = self.limitADSB.value()
@@ -902,14 +1513,18 @@ class SDBWidget(QWidget):
             'limit_state': self.limitCheckBox.isChecked(),
             'limit_a': self.limitADSB.value(),
             'limit_b': self.limitBDSB.value(),
-            'method': self.methodCB.currentText()
+            'method': self.methodCB.currentText(),
+            'sample_path': self.sample_path,
+            'options': self.options()
         }
+        self.init_input = init_input
 
         try:
-            if sample_raw[self.depthHeaderCB.currentText()].dtype == 'float':
-                self.sdbProcess = Process()
+            if sample_preview[self.depthHeaderCB.currentText()].dtype == 'float':
+                self.sdbProcess = Process(self.newJob())
                 self.widget_signal.connect(self.sdbProcess.inputs)
                 self.widget_signal.emit(init_input)
+                self.sdbProcess.finished.connect(self.jobFinished)
                 self.sdbProcess.start()
                 self.sdbProcess.time_signal.connect(self.timeCounting)
                 self.sdbProcess.thread_signal.connect(self.results)
@@ -924,6 +1539,106 @@ class SDBWidget(QWidget):
             )
 
 
+    def predictModelWindow(self):
+        '''
+        Saved model loading User Interface for predicting
+        the loaded image without depth sample
+        '''
+
+        self.predictModelDialog = QDialog()
+        self.predictModelDialog.setWindowTitle('Predict Using Model')
+        self.predictModelDialog.setWindowIcon(QIcon(resource_path('icons/load-pngrepo-com.png')))
+
+        openFilesButton = QPushButton('Open Model File')
+        openFilesButton.clicked.connect(
+            lambda: self.fileDialog(
+                command=QFileDialog.getOpenFileName,
+                window_text='Open Model File',
+                file_type='SDB GUI Model (*.joblib)',
+                text_browser=self.modellocList
+            )
+        )
+
+        locLabel = QLabel('Location:')
+        self.modellocList = QTextBrowser()
+
+        cancelButton = QPushButton('Cancel')
+        cancelButton.clicked.connect(self.predictModelDialog.close)
+        predictButton = QPushButton('Predict')
+        predictButton.clicked.connect(self.predictModelDialog.close)
+        predictButton.clicked.connect(self.predictModel)
+
+        grid = QGridLayout()
+        grid.addWidget(openFilesButton, 1, 1, 1, 4)
+
+        grid.addWidget(locLabel, 4, 1, 1, 1)
+
+        grid.addWidget(self.modellocList, 5, 1, 10, 4)
+
+        grid.addWidget(predictButton, 15, 3, 1, 1)
+        grid.addWidget(cancelButton, 15, 4, 1, 1)
+
+        self.predictModelDialog.setLayout(grid)
+
+        self.predictModelDialog.exec_()
+
+
+    def predictModel(self):
+        '''
+        Sending saved model location and options from widget to Process Class
+        to predict the loaded image without refitting
+        '''
+        if self.running() == True:
+            self.warningWithoutClear(
+                'Please wait until the running job is finished or cancel it!'
+            )
+            return
+
+        self.resultText.clear()
+        self.progressBar.setValue(0)
+        self.progressBar.setMaximum(PREDICT_ONLY_STEP)
+
+        if self.modellocList.toPlainText() == '':
+            self.warningWithClear(
+                'No model file selected. Please select your model file!'
+            )
+            return
+
+        global time_list
+        time_list = []
+        init_input = {
+            'model_path': self.modellocList.toPlainText(),
+            'options': self.options()
+        }
+        self.init_input = init_input
+
+        self.sdbProcess = Process(self.newJob())
+        self.widget_signal.connect(self.sdbProcess.inputs)
+        self.widget_signal.emit(init_input)
+        self.sdbProcess.finished.connect(self.jobFinished)
+        self.sdbProcess.start()
+        self.sdbProcess.time_signal.connect(self.timeCounting)
+        self.sdbProcess.thread_signal.connect(self.results)
+        self.sdbProcess.warning_with_clear.connect(self.warningWithClear)
+
+
+    def options(self):
+        '''
+        Collecting processing and method options into one dictionary
+        '''
+
+        return {
+            'proc': proc_op_dict,
+            'knn': knn_op_dict,
+            'mlr': mlr_op_dict,
+            'rf': rf_op_dict,
+            'svm': svm_op_dict,
+            'svma': svma_op_dict,
+            'hgb': hgb_op_dict,
+            'tune': tune_op_dict
+        }
+
+
     def timeCounting(self, time_text):
         '''
         Receive time value on every step and its corresponding processing
@@ -940,86 +1655,41 @@ class SDBWidget(QWidget):
 
     def results(self, result_dict):
         '''
-        Recieve processing results and filter the predicted value to depth
-        limit window (if enabled).
+        Recieve processing results (predicted value is already filtered to
+        depth limit window if enabled).
         Counting runtimes using saved time values and printing result info.
         '''
 
-        global z_predict
-        z_predict = result_dict['z_predict']
-        rmse, mae, r2 = result_dict['rmse'], result_dict['mae'], result_dict['r2']
-
-        global train_data_df, test_data_df
-        train_data_df, test_data_df = result_dict['train'], result_dict['test']
-
-        global sample_geodataframe, sample_dataframe
-        sample_geodataframe, sample_dataframe = result_dict['sample_edit'], result_dict['sample_df']
-
-        if self.limitCheckBox.isChecked() == False:
-            print('checking prediction')
-            z_predict[z_predict < self.limitBDSB.value()] = np.nan
-            z_predict[z_predict > self.limitADSB.value()] = np.nan
+        global result_data
+        # Remove temporary prediction raster of the previous tiled run (if any)
+        try:
+            remove_prediction(result_data)
+        except NameError:
+            pass
+        result_data = result_dict
 
-            print_limit = (
-                'Depth Limit:\t\tfrom ' + str(self.limitADSB.value()) + ' m ' +
-                'to ' + str(self.limitBDSB.value()) + ' m'
+        global print_result_info
+        if 'model_path' in self.init_input:
+            print_result_info = predict_only_info(
+                image_path=self.imglocList.toPlainText(),
+                model_path=self.init_input['model_path'],
+                image_raw=image_raw,
+                options=self.init_input['options'],
+                result=result_dict,
+                time_list=time_list
             )
         else:
-            print_limit = (
-                'Depth Limit:\t\tDisabled'
+            print_result_info = result_info(
+                image_path=self.imglocList.toPlainText(),
+                sample_path=self.samplelocList.toPlainText(),
+                image_raw=image_raw,
+                sample_raw=sample_raw,
+                inputs=self.init_input,
+                options=self.init_input['options'],
+                result=result_dict,
+                time_list=time_list
             )
 
-        if proc_op_dict['auto_negative'] == True:
-            auto_negative = 'Enabled'
-        elif proc_op_dict['auto_negative'] == False:
-            auto_negative = 'Disabled'
-
-        time_array = np.array(time_list)
-        time_diff = time_array[1:] - time_array[:-1]
-        runtime = np.append(time_diff, time_list[-1] - time_list[0])
-
-        coord1 = np.array(image_raw.transform * (0, 0))
-        coord2 = np.array(image_raw.transform * (1, 1))
-        pixel_size = abs(coord2 - coord1)
-
-        global print_result_info
-        print_result_info = (
-            'Software Version:\t' + SDB_GUI_VERSION + '\n\n' +
-            'Image Input:\t\t' + self.imglocList.toPlainText() + ' (' +
-            str(round(img_size / 2**20, 2)) + ' MB)\n' +
-            'Sample Data:\t\t' + self.samplelocList.toPlainText() + ' (' +
-            str(round(sample_size / 2**20, 2)) + ' MB)\n\n' +
-            print_limit + '\n' +
-            'Used Sample:\t\t' + str(sample_dataframe.shape[0]) + ' points (' +
-            str(round(sample_dataframe.shape[0] / sample_raw.shape[0] * 100, 2)) +
-            '% of all sample)\n' +
-            'Train Data:\t\t' + str(train_data_df.shape[0]) + ' points (' +
-            str(self.trainPercentDSB.value()) + ' % of used sample)\n' +
-            'Test Data:\t\t' + str(test_data_df.shape[0]) + ' points (' +
-            str(100 - self.trainPercentDSB.value()) + ' % of used sample)\n\n' +
-            'Method:\t\t' + self.methodCB.currentText() + '\n' +
-            print_parameters_info + '\n\n'
-            'RMSE:\t\t' + str(rmse) + '\n' +
-            'MAE:\t\t' + str(mae) + '\n' +
-            'R\u00B2:\t\t' + str(r2) + '\n\n' +
-            'Parallel Backend:\t' + str(proc_op_dict['backend']) + '\n' +
-            'Processing Cores:\t' + str(proc_op_dict['n_jobs']) + '\n' +
-            'Random State:\t\t' + str(proc_op_dict['random_state']) + '\n'
-            'Auto Negative Sign:\t' + auto_negative + '\n\n' +
-            'Reproject Runtime:\t' + str(runtime[0]) + '\n' +
-            'Filtering Runtime:\t' + str(runtime[1]) + '\n' +
-            'Sampling Runtime:\t' + str(runtime[2]) + '\n' +
-            'Fitting Runtime:\t\t' + str(runtime[3]) + '\n' +
-            'Prediction Runtime:\t' + str(runtime[4]) + '\n' +
-            'Validating Runtime:\t' + str(runtime[5]) + '\n' +
-            'Overall Runtime:\t' + str(runtime[6]) + '\n\n' +
-            'CRS:\t\t' + str(image_raw.crs) + '\n'
-            'Dimensions:\t\t' + str(image_raw.width) + ' x ' +
-            str(image_raw.height) + ' pixels\n' +
-            'Pixel Size:\t\t' + str(pixel_size[0]) + ' , ' +
-            str(pixel_size[1]) + '\n\n'
-        )
-
         self.resultText.setText(print_result_info)
 
 
@@ -1104,6 +1774,34 @@ class SDBWidget(QWidget):
         self.dataTypeCB.addItems(format_list)
         self.dataTypeCB.setCurrentText('GeoTIFF (*.tif)')
 
+        outputTypeLabel = QLabel('Output Data Type:')
+        self.outputTypeCB = QComboBox()
+        self.outputTypeCB.addItems(['float32', 'float64'])
+        self.outputTypeCB.setCurrentText(proc_op_dict['compute_dtype'])
+
+        tiffProfileLabel = QLabel('GeoTIFF Profile:')
+        self.tiffProfileCB = QComboBox()
+        self.tiffProfileCB.addItems(list(TIFF_PROFILE_DICT))
+        self.tiffProfileCB.setCurrentText('Tiled DEFLATE')
+
+        self.overviewsCheckBox = QCheckBox('Internal Overviews')
+        self.overviewsCheckBox.setChecked(False)
+
+        xyzPrecisionLabel = QLabel('XYZ Decimal Places:')
+        self.xyzPrecisionSB = QSpinBox()
+        self.xyzPrecisionSB.setRange(0, 9)
+        self.xyzPrecisionSB.setValue(3)
+        self.xyzPrecisionSB.setAlignment(Qt.AlignRight)
+
+        self.xyzDropNaNCheckBox = QCheckBox('Skip No Data')
+        self.xyzDropNaNCheckBox.setChecked(True)
+
+        self.xyzGzipCheckBox = QCheckBox('Gzip')
+        self.xyzGzipCheckBox.setChecked(False)
+
+        self.dataTypeCB.currentTextChanged.connect(self.formatOptionState)
+        self.formatOptionState()
+
         saveFileButton = QPushButton('Save File Location')
         saveFileButton.clicked.connect(
             lambda:self.fileDialog(
@@ -1141,6 +1839,9 @@ class SDBWidget(QWidget):
         self.reportCheckBox = QCheckBox('Save Report')
         self.reportCheckBox.setChecked(True)
 
+        self.saveModelCheckBox = QCheckBox('Save Model')
+        self.saveModelCheckBox.setChecked(False)
+
         cancelButton = QPushButton('Cancel')
         cancelButton.clicked.connect(self.saveOptionDialog.close)
         saveButton = QPushButton('Save')
@@ -1151,147 +1852,244 @@ class SDBWidget(QWidget):
         grid.addWidget(dataTypeLabel, 1, 1, 1, 2)
         grid.addWidget(self.dataTypeCB, 1, 3, 1, 2)
 
-        grid.addWidget(medianFilterLabel, 2, 1, 1, 1)
-        grid.addWidget(self.medianFilterSB, 2, 2, 1, 1)
-        grid.addWidget(self.medianFilterCheckBox, 2, 3, 1, 2)
+        grid.addWidget(outputTypeLabel, 2, 1, 1, 2)
+        grid.addWidget(self.outputTypeCB, 2, 3, 1, 2)
 
-        grid.addWidget(saveFileButton, 3, 1, 1, 4)
+        grid.addWidget(tiffProfileLabel, 3, 1, 1, 1)
+        grid.addWidget(self.tiffProfileCB, 3, 2, 1, 2)
+        grid.addWidget(self.overviewsCheckBox, 3, 4, 1, 1)
 
-        grid.addWidget(locLabel, 4, 1, 1, 4)
-        grid.addWidget(self.savelocList, 5, 1, 1, 4)
+        grid.addWidget(xyzPrecisionLabel, 4, 1, 1, 1)
+        grid.addWidget(self.xyzPrecisionSB, 4, 2, 1, 1)
+        grid.addWidget(self.xyzDropNaNCheckBox, 4, 3, 1, 1)
+        grid.addWidget(self.xyzGzipCheckBox, 4, 4, 1, 1)
 
-        grid.addWidget(self.trainTestDataCheckBox, 6, 1, 1, 2)
-        grid.addWidget(self.trainTestFormatCB, 6, 3, 1, 1)
-        grid.addWidget(trainTestLabel, 6, 4, 1, 1)
+        grid.addWidget(medianFilterLabel, 5, 1, 1, 1)
+        grid.addWidget(self.medianFilterSB, 5, 2, 1, 1)
+        grid.addWidget(self.medianFilterCheckBox, 5, 3, 1, 2)
 
-        grid.addWidget(self.saveDEMCheckBox, 7, 1, 1, 1)
-        grid.addWidget(self.reportCheckBox, 7, 2, 1, 1)
-        grid.addWidget(saveButton, 7, 3, 1, 1)
-        grid.addWidget(cancelButton, 7, 4, 1, 1)
+        grid.addWidget(saveFileButton, 6, 1, 1, 4)
+
+        grid.addWidget(locLabel, 7, 1, 1, 4)
+        grid.addWidget(self.savelocList, 8, 1, 1, 4)
+
+        grid.addWidget(self.trainTestDataCheckBox, 9, 1, 1, 2)
+        grid.addWidget(self.trainTestFormatCB, 9, 3, 1, 1)
+        grid.addWidget(trainTestLabel, 9, 4, 1, 1)
+
+        grid.addWidget(self.saveDEMCheckBox, 10, 1, 1, 1)
+        grid.addWidget(self.reportCheckBox, 10, 2, 1, 1)
+        grid.addWidget(self.saveModelCheckBox, 10, 3, 1, 1)
+
+        grid.addWidget(saveButton, 11, 3, 1, 1)
+        grid.addWidget(cancelButton, 11, 4, 1, 1)
 
         self.saveOptionDialog.setLayout(grid)
 
         self.saveOptionDialog.exec_()
 
 
-    def saveAction(self):
+    def formatOptionState(self):
         '''
-        Saving predicted depth, training and testing data, and/or report into file.
-        Applying median filter (or not) to the predicted depth array before saving.
+        Enabling GeoTIFF output options only when GeoTIFF is selected
+        and XYZ output options only when ASCII XYZ is selected
         '''
 
-        try:
-            if self.saveDEMCheckBox.isChecked() == True:
-                z_img_ar = z_predict.reshape(image_raw.height, image_raw.width)
-
-                if self.medianFilterCheckBox.isChecked() == False:
-                    print_filter_info = (
-                        'Median Filter Size:\t' + str(self.medianFilterSB.value())
-                    )
-                    z_img_ar = ndimage.median_filter(z_img_ar, size=self.medianFilterSB.value())
-                else:
-                    print_filter_info = (
-                        'Median Filter Size:\tDisabled'
-                    )
-
-                new_img = rio.open(
-                    self.savelocList.toPlainText(),
-                    'w',
-                    driver=format_dict[self.dataTypeCB.currentText()],
-                    height=image_raw.height,
-                    width=image_raw.width,
-                    count=1,
-                    dtype=z_img_ar.dtype,
-                    crs=image_raw.crs,
-                    transform=image_raw.transform
-                )
-
-                new_img.write(z_img_ar, 1)
-                new_img.close()
-
-                new_img_size = os.path.getsize(self.savelocList.toPlainText())
-                print_dem_info = (
-                    print_filter_info + '\n\n'
-                    'DEM Output:\t\t' + self.savelocList.toPlainText() + ' (' +
-                    str(round(new_img_size / 2**10 / 2**10, 2)) + ' MB)\n'
-                )
-            elif self.saveDEMCheckBox.isChecked() == False:
-                print_dem_info = (
-                    'DEM Output:\t\tNot Saved\n'
-                )
+        tiff_state = format_dict[self.dataTypeCB.currentText()] == 'GTiff'
+        xyz_state = format_dict[self.dataTypeCB.currentText()] == 'XYZ'
 
-            if self.trainTestDataCheckBox.isChecked() == True:
-                train_save_loc = (
-                    os.path.splitext(self.savelocList.toPlainText())[0] +
-                    '_train' + self.trainTestFormatCB.currentText()
-                )
-                test_save_loc = (
-                    os.path.splitext(self.savelocList.toPlainText())[0] +
-                    '_test' + self.trainTestFormatCB.currentText()
-                )
+        self.tiffProfileCB.setEnabled(tiff_state)
+        self.overviewsCheckBox.setEnabled(tiff_state)
 
-                if self.trainTestFormatCB.currentText() == '.csv':
-                    train_data_df.to_csv(train_save_loc, index=False)
-                    test_data_df.to_csv(test_save_loc, index=False)
-                elif self.trainTestFormatCB.currentText() == '.shp':
-                    train_data_gdf = gpd.GeoDataFrame(
-                        train_data_df.copy(),
-                        geometry=gpd.points_from_xy(
-                            train_data_df.x,
-                            train_data_df.y,
-                            train_data_df.z
-                        ),
-                        crs=sample_geodataframe.crs
-                    )
-                    test_data_gdf = gpd.GeoDataFrame(
-                        test_data_df.copy(),
-                        geometry=gpd.points_from_xy(
-                            test_data_df.x,
-                            test_data_df.y,
-                            test_data_df.z
-                        ),
-                        crs=sample_geodataframe.crs
-                    )
-
-                    train_data_gdf.to_file(train_save_loc)
-                    test_data_gdf.to_file(test_save_loc)
-
-                train_data_size = os.path.getsize(train_save_loc)
-                test_data_size = os.path.getsize(test_save_loc)
-
-                print_train_test_info = (
-                    'Train Data Output:\t' + train_save_loc + ' (' +
-                    str(round(train_data_size / 2**10 / 2**10, 2)) + ' MB)\n'
-                    'Test Data output:\t' + test_save_loc + ' (' +
-                    str(round(test_data_size / 2**10 / 2**10, 2)) + ' MB)\n'
-                )
-            elif self.trainTestDataCheckBox.isChecked() == False:
-                print_train_test_info = (
-                    'Train Data Output:\tNot Saved\n'
-                    'Test Data output:\tNot Saved\n'
-                )
+        self.xyzPrecisionSB.setEnabled(xyz_state)
+        self.xyzDropNaNCheckBox.setEnabled(xyz_state)
+        self.xyzGzipCheckBox.setEnabled(xyz_state)
 
-            self.resultText.append(print_dem_info)
-            self.resultText.append(print_train_test_info)
 
-            if self.reportCheckBox.isChecked() == True:
-                report_save_loc = (
-                    os.path.splitext(self.savelocList.toPlainText())[0] +
-                    '_report.txt'
-                )
-                report = open(report_save_loc, 'w')
+    def saveAction(self):
+        '''
+        Sending save options and results from widget to Save Class
+        to save predicted depth, training and testing data, model and/or
+        report into file in the background.
+        '''
 
-                report.write(
-                    print_result_info +
-                    print_dem_info +
-                    print_train_test_info
-                )
-        except:
+        if self.savelocList.toPlainText() == '':
             self.saveOptionDialog.close()
             self.warningWithoutClear(
                 'Please insert save location!'
             )
             self.saveOptionWindow()
+            return
+
+        if self.running() == True:
+            self.warningWithoutClear(
+                'Please wait until the running job is finished or cancel it!'
+            )
+            return
+
+        try:
+            result_data
+        except NameError:
+            self.warningWithoutClear(
+                'No prediction result. Please make prediction first!'
+            )
+            return
+
+        if self.saveDEMCheckBox.isChecked() == True:
+            if self.medianFilterCheckBox.isChecked() == False:
+                filter_size = self.medianFilterSB.value()
+            else:
+                filter_size = None
+
+            dem_options = {
+                'driver': format_dict[self.dataTypeCB.currentText()],
+                'dtype': self.outputTypeCB.currentText(),
+                'filter_size': filter_size,
+                'tile_size': proc_op_dict['tile_size'],
+                'xyz_options': {
+                    'drop_nan': self.xyzDropNaNCheckBox.isChecked(),
+                    'precision': self.xyzPrecisionSB.value(),
+                    'compress': self.xyzGzipCheckBox.isChecked()
+                },
+                'tiff_options': {
+                    'profile': self.tiffProfileCB.currentText(),
+                    'overviews': self.overviewsCheckBox.isChecked()
+                },
+                'n_jobs': proc_op_dict['n_jobs']
+            }
+        else:
+            dem_options = None
+
+        if self.trainTestDataCheckBox.isChecked() == True:
+            train_test_format = self.trainTestFormatCB.currentText()
+        else:
+            train_test_format = None
+
+        if self.saveModelCheckBox.isChecked() == True and 'regressor' in result_data:
+            metadata = model_metadata(
+                image_raw=image_raw,
+                inputs=self.init_input,
+                options=self.init_input['options'],
+                result=result_data
+            )
+        else:
+            metadata = None
+
+        if self.reportCheckBox.isChecked() == True:
+            report_text = print_result_info
+        else:
+            report_text = None
+
+        save_input = {
+            'result': result_data,
+            'save_path': self.savelocList.toPlainText(),
+            'dem_options': dem_options,
+            'train_test_format': train_test_format,
+            'metadata': metadata,
+            'report_text': report_text
+        }
+
+        self.progressBar.setValue(0)
+        self.progressBar.setMaximum(max(1, save_steps(
+            result_data, dem_options, train_test_format, metadata, report_text
+        )))
+
+        self.sdbSave = Save(self.newJob())
+        self.sdbSave.inputs(save_input)
+        self.sdbSave.time_signal.connect(self.saveStep)
+        self.sdbSave.thread_signal.connect(self.resultText.append)
+        self.sdbSave.warning_without_clear.connect(self.warningWithoutClear)
+        self.sdbSave.finished.connect(self.jobFinished)
+        self.sdbSave.start()
+
+
+    def saveStep(self, time_text):
+        '''
+        Receive text of every saved output to show in result text browser
+        and increase progress bar.
+        '''
+
+        self.resultText.append(time_text[1])
+        self.progressBar.setValue(self.progressBar.value() + 1)
+
+
+    def running(self):
+        '''
+        Checking whether processing or saving is still running
+        '''
+
+        for job in [self.sdbProcess, self.sdbSave]:
+            if job is not None and job.isRunning():
+                return True
+
+        return False
+
+
+    def newJob(self):
+        '''
+        New cancel and pause state for the job about to start,
+        enabling pause and cancel buttons
+        '''
+
+        self.job_control = JobControl()
+        self.pauseButton.setText('Pause')
+        self.pauseButton.setEnabled(True)
+        self.cancelButton.setEnabled(True)
+
+        return self.job_control
+
+
+    def jobFinished(self):
+        '''
+        Disabling pause and cancel buttons after the job has finished
+        '''
+
+        self.pauseButton.setText('Pause')
+        self.pauseButton.setEnabled(False)
+        self.cancelButton.setEnabled(False)
+
+
+    def pauseAction(self):
+        '''
+        Pausing the running job at its next checkpoint or resuming it
+        '''
+
+        if self.job_control.paused() == False:
+            self.job_control.pause()
+            self.pauseButton.setText('Resume')
+        else:
+            self.job_control.resume()
+            self.pauseButton.setText('Pause')
+
+
+    def cancelAction(self):
+        '''
+        Cancelling the running job at its next checkpoint
+        '''
+
+        self.job_control.cancel()
+        self.pauseButton.setEnabled(False)
+        self.cancelButton.setEnabled(False)
+
+
+    def closeEvent(self, event):
+        '''
+        Cancelling the running job and removing temporary prediction
+        raster of the last tiled run (if any) when the widget is closed
+        '''
+
+        if self.running() == True:
+            self.job_control.cancel()
+            for job in [self.sdbProcess, self.sdbSave]:
+                if job is not None:
+                    job.wait()
+
+        try:
+            remove_prediction(result_data)
+        except NameError:
+            pass
+
+        event.accept()
 
 
     def licensesDialog(self):
@@ -1363,16 +2161,10 @@ class Process(QThread):
     warning_with_clear = pyqtSignal(str)
     warning_without_clear = pyqtSignal(str)
 
-    def __init__(self):
+    def __init__(self, cancel=None):
 
         QThread.__init__(self)
-
-        self.method_dict = {
-            'K-Nearest Neighbors': self.knnPredict,
-            'Multiple Linear Regression': self.mlrPredict,
-            'Random Forest': self.rfPredict, 
-            'Support Vector Machines': self.svmPredict
-        }
+        self.cancel = cancel
 
 
     def inputs(self, input_dict):
@@ -1380,318 +2172,170 @@ class Process(QThread):
         Pooling inputs from widget
         '''
 
-        self.depth_label = input_dict['depth_label']
-        self.train_size = input_dict['train_size']
-        self.limit_state = input_dict['limit_state']
-        self.limit_a_value = input_dict['limit_a']
-        self.limit_b_value = input_dict['limit_b']
-        self.method = input_dict['method']
+        self.input_dict = input_dict
 
 
-    def preprocess(self):
+    def timeStep(self, text):
         '''
-        Preparing input values from widget to use on 
-        training models and predicting depth by reprojecting 
-        depth sample CRS, sampling raster value and depth value, 
-        and then limiting or not limiting depth value.
+        Sending the start time and text of a processing step to widget
         '''
-        print('Pre Processing')
-
-        time_start = datetime.datetime.now()
-
-        image_crs = str(image_raw.crs).upper()
-        sample_crs = str(sample_raw.crs).upper()
-
-        # Reproject sample CRS
-        if image_crs != sample_crs:
-            start_list = [time_start, 'Reprojecting...\n']
-            self.time_signal.emit(start_list)
-
-            sample_edit = sample_raw.to_crs(image_crs)
-        else:
-            start_list = [time_start, 'Skip Reproject...\n']
-            self.time_signal.emit(start_list)
-
-            sample_edit = sample_raw.copy()
-
-        # Filtering
-        if proc_op_dict['exclude_outside'] == True:
-            time_reproj = datetime.datetime.now()
-            reproj_list = [time_reproj, 'Filtering Out of Bound Points...\n']
-            self.time_signal.emit(reproj_list)
-
-            # Image boundary coordinates
-            x0, x1 = image_raw.bounds.left, image_raw.bounds.right
-            y0, y1 = image_raw.bounds.bottom, image_raw.bounds.top
-
-            # Filter out of bound points and reset index count
-            sample_edit = sample_edit[
-                (sample_edit['geometry'].x > x0) &
-                (sample_edit['geometry'].x < x1) &
-                (sample_edit['geometry'].y > y0) &
-                (sample_edit['geometry'].y < y1)
-            ].reset_index(drop=True)
-        elif proc_op_dict['exclude_outside'] == False:
-            time_reproj = datetime.datetime.now()
-            reproj_list = [time_reproj, 'Skip Filtering Out of Bound Points...\n']
-            self.time_signal.emit(reproj_list)
-
-        time_filter = datetime.datetime.now()
-        filter_list = [time_filter, 'Point Sampling...\n']
-        self.time_signal.emit(filter_list)
-
-        # Define shp_geo variable because sample_edit['geometry'] is too long
-        shp_geo = sample_edit['geometry']
-
-        col_names = []
-
-        # Point Sampling
-        with parallel_backend(proc_op_dict['backend'], n_jobs=proc_op_dict['n_jobs']):
-
-            row, col = np.array(image_raw.index(shp_geo.x, shp_geo.y))
-            sample_bands = image_raw.read()[:, row, col].T
-
-            for i in image_raw.indexes:
-                col_names.append('band' + str(i))
-
-        sample_df = pd.DataFrame(sample_bands, columns=col_names)
-        sample_df['x'], sample_df['y'] = shp_geo.x, shp_geo.y
-        sample_df['z'] = sample_edit[self.depth_label]
-
-        # Drop any missing values
-        sample_df = sample_df.dropna()
-
-        # Auto Negative
-        if proc_op_dict['auto_negative'] == True and np.median(sample_df['z']) > 0:
-            sample_df['z'] = sample_df['z'] * -1
-
-        # Depth Limit
-        if self.limit_state == False:
-            sample_df = sample_df[sample_df['z'] >= self.limit_b_value]
-            sample_df = sample_df[sample_df['z'] <= self.limit_a_value]
-
-        features_all = sample_df.iloc[:, 0:-1]
-        z = sample_df['z']
-
-        features_all_train, features_all_test, z_train, z_test = train_test_split(
-            features_all,
-            z,
-            train_size=self.train_size,
-            random_state=proc_op_dict['random_state']
-            )
 
-        features_train = features_all_train.iloc[:, 0:-2]
-        features_test = features_all_test.iloc[:, 0:-2]
+        self.time_signal.emit([datetime.datetime.now(), text])
 
-        train_data = pd.concat([features_all_train, z_train], axis=1)
-        test_data = pd.concat([features_all_test, z_test], axis=1)
-        test_data = test_data.reset_index(drop=True)
 
-        samples_split = [features_train, features_test, z_train, z_test, train_data, test_data]
-        samples_split = [
-            features_train,
-            features_test,
-            z_train,
-            z_test,
-            train_data,
-            test_data,
-            sample_edit,
-            sample_df
-        ]
-
-        return samples_split
-
-
-    def knnPredict(self):
+    def run(self):
         '''
-        Preparing KNN prediction and saving selected parameters
-        for report
+        Taking inputs and chosen method, then running the SDB processing
+        (preprocessing, fitting training data to chosen model, and making
+        prediction based on trained model) in the background.
         '''
-        print('knnPredict')
-
-        parameters = self.preprocess()
-
-        regressor = KNeighborsRegressor(
-            n_neighbors=knn_op_dict['n_neighbors'],
-            weights=knn_op_dict['weights'],
-            algorithm=knn_op_dict['algorithm'],
-            leaf_size=knn_op_dict['leaf_size']
-        )
-
-        parameters.append(regressor)
-
-        global print_parameters_info
-        print_parameters_info = (
-            'N Neighbors:\t\t' + str(knn_op_dict['n_neighbors']) + '\n' +
-            'Weights:\t\t' + str(knn_op_dict['weights']) + '\n' +
-            'Algorithm:\t\t' + str(knn_op_dict['algorithm']) + '\n' +
-            'Leaf Size:\t\t' + str(knn_op_dict['leaf_size'])
-        )
+        print('Process run')
 
-        return parameters
+        try:
+            if 'model_path' in self.input_dict:
+                result = predict_only(
+                    image_raw=image_raw,
+                    model_path=self.input_dict['model_path'],
+                    options=self.input_dict['options'],
+                    callback=self.timeStep,
+                    cancel=self.cancel
+                )
+            else:
+                # Reading the whole sample, only the depth column besides
+                # the geometry, unless it is already read for the same sample
+                # and image (or read whole). Points out of the image are not
+                # read when they would be filtered out anyway.
+                global sample_raw
+                global sample_key
+                depth_label = self.input_dict['depth_label']
+                sample_path = self.input_dict['sample_path']
+                if self.input_dict['options']['proc']['exclude_outside'] == True:
+                    footprint_raw = image_raw
+                    key = (sample_path, os.path.abspath(image_raw.name))
+                else:
+                    footprint_raw = None
+                    key = (sample_path, None)
+
+                if (
+                    sample_raw is None or
+                    depth_label not in sample_raw.columns or
+                    sample_key not in [key, (sample_path, None)]
+                ):
+                    sample_raw = load_sample(sample_path, [depth_label], footprint_raw)
+                    sample_key = key
+
+                result = process(
+                    image_raw=image_raw,
+                    sample_raw=sample_raw,
+                    inputs=self.input_dict,
+                    options=self.input_dict['options'],
+                    callback=self.timeStep,
+                    cancel=self.cancel
+                )
 
+            self.thread_signal.emit(result)
+        except NameError:
+            self.warning_with_clear.emit(
+                'No image data loaded. Please load your image data!'
+            )
+        except IndexError:
+            self.warning_with_clear.emit(
+                'Depth sample is out of image boundary'
+            )
+        except ValueError as error:
+            self.warning_with_clear.emit(str(error))
+        except Cancelled:
+            self.warning_with_clear.emit(
+                'Processing cancelled.'
+            )
 
-    def mlrPredict(self):
-        '''
-        Preparing MLR prediction and saving selected parameters
-        for report
-        '''
-        print('mlrPredict')
 
-        parameters = self.preprocess()
 
-        regressor = LinearRegression(
-            fit_intercept=mlr_op_dict['fit_intercept'],
-            normalize=mlr_op_dict['normalize'],
-            copy_X=mlr_op_dict['copy_x']
-        )
+class Save(QThread):
+    '''
+    Output saving class of SDB GUI.
+    Saving DEM, training and testing data, model and report in the
+    background so the GUI won't freeze while writing large outputs.
+    '''
 
-        parameters.append(regressor)
+    thread_signal = pyqtSignal(str)
+    time_signal = pyqtSignal(list)
+    warning_without_clear = pyqtSignal(str)
 
-        global print_parameters_info
-        print_parameters_info = (
-            'Fit Intercept:\t\t' + str(mlr_op_dict['fit_intercept']) + '\n' +
-            'Normalize:\t\t' + str(mlr_op_dict['normalize']) + '\n' +
-            'Copy X:\t\t' + str(mlr_op_dict['copy_x'])
-        )
+    def __init__(self, cancel=None):
 
-        return parameters
+        QThread.__init__(self)
+        self.cancel = cancel
 
 
-    def rfPredict(self):
+    def inputs(self, input_dict):
         '''
-        Preparing RF prediction and saving selected parameters
-        for report
+        Pooling save inputs from widget
         '''
-        print('rfPredict')
-
-        parameters = self.preprocess()
-
-        regressor = RandomForestRegressor(
-            n_estimators=rf_op_dict['n_estimators'],
-            criterion=rf_op_dict['criterion'],
-            bootstrap=rf_op_dict['bootstrap'],
-            random_state=rf_op_dict['random_state'])
-
-        parameters.append(regressor)
 
-        global print_parameters_info
-        print_parameters_info = (
-            'N Trees:\t\t' + str(rf_op_dict['n_estimators']) + '\n' +
-            'Criterion:\t\t' + str(rf_op_dict['criterion']) + '\n' +
-            'Bootstrap:\t\t' + str(rf_op_dict['bootstrap']) + '\n' +
-            'Random State:\t\t' + str(rf_op_dict['random_state'])
-        )
-
-        return parameters
+        self.input_dict = input_dict
 
 
-    def svmPredict(self):
+    def timeStep(self, text):
         '''
-        Preparing SVM prediction and saving selected parameters
-        for report
+        Sending the time and text of a saved output to widget
         '''
-        print('svmPredict')
-
-        parameters = self.preprocess()
-
-        regressor = SVR(
-            kernel=svm_op_dict['kernel'],
-            gamma=svm_op_dict['gamma'],
-            C=svm_op_dict['c'],
-            degree=svm_op_dict['degree'],
-            cache_size=8000)
-
-        parameters.append(regressor)
-
-        global print_parameters_info
-        print_parameters_info = (
-            'Kernel:\t\t' + str(svm_op_dict['kernel']) +'\n' +
-            'Gamma:\t\t' + str(svm_op_dict['gamma']) + '\n' +
-            'C:\t\t' + str(svm_op_dict['c'])
-        )
 
-        if svm_op_dict['kernel'] == 'poly':
-            print_parameters_info = (
-                print_parameters_info + '\n' +
-                'Degree:\t\t' + str(svm_op_dict['degree'])
-            )
-
-        return parameters
+        self.time_signal.emit([datetime.datetime.now(), text])
 
 
     def run(self):
         '''
-        Taking pre processed input and chosen method, then 
-        fitting training data to chosen model and make prediction
-        based on trained model.
+        Writing DEM, training and testing data and model at the same time,
+        then the report, in the background.
         '''
-        print('Process run')
-
         try:
-            parameters = self.method_dict[self.method]()
-
-            features_train = parameters[0]
-            features_test = parameters[1]
-            z_train = parameters[2]
-            z_test = parameters[3]
-            regressor = parameters[-1]
-
-            time_sampling = datetime.datetime.now()
-            sampling_list = [time_sampling, 'Fitting...\n']
-            self.time_signal.emit(sampling_list)
-
-            with parallel_backend(proc_op_dict['backend'], n_jobs=proc_op_dict['n_jobs']):
-
-                regressor.fit(features_train, z_train)
-                time_fit = datetime.datetime.now()
-                fit_list = [time_fit, 'Predicting...\n']
-                self.time_signal.emit(fit_list)
-
-                z_predict = regressor.predict(bands_array)
-                time_predict = datetime.datetime.now()
-                predict_list = [time_predict,'Validating...\n']
-                self.time_signal.emit(predict_list)
-
-                z_validate = regressor.predict(features_test)
-                rmse = np.sqrt(metrics.mean_squared_error(z_test, z_validate))
-                mae = metrics.mean_absolute_error(z_test, z_validate)
-                r2 = metrics.r2_score(z_test, z_validate)
-                z_validate_df = pd.DataFrame({'z_validate': z_validate})
-                test_data_update = pd.concat([parameters[5], z_validate_df], axis=1)
-                time_test = datetime.datetime.now()
-                test_list = [time_test, 'Done.']
-                self.time_signal.emit(test_list)
-
-            result = {
-                'z_predict': z_predict,
-                'rmse': rmse,
-                'mae': mae,
-                'r2': r2,
-                'train': parameters[4],
-                'test': test_data_update,
-                'sample_edit': parameters[6],
-                'sample_df': parameters[7]
-            }
+            print_output_info = save_outputs(
+                result=self.input_dict['result'],
+                image_raw=image_raw,
+                save_path=self.input_dict['save_path'],
+                dem_options=self.input_dict['dem_options'],
+                train_test_format=self.input_dict['train_test_format'],
+                metadata=self.input_dict['metadata'],
+                report_text=self.input_dict['report_text'],
+                callback=self.timeStep,
+                cancel=self.cancel
+            )
 
-            self.thread_signal.emit(result)
-        except NameError:
-            self.warning_with_clear.emit(
-                'No image data loaded. Please load your image data!'
+            self.thread_signal.emit(print_output_info)
+        except Cancelled:
+            self.warning_without_clear.emit(
+                'Saving cancelled. Unfinished DEM file was removed.'
             )
-        except IndexError:
-            self.warning_with_clear.emit(
-                'Depth sample is out of image boundary'
+        except Exception as error:
+            self.warning_without_clear.emit(
+                'Saving failed: ' + str(error)
             )
 
 
 
+def background_imports():
+    '''
+    Importing the heavy libraries of SDB GUI while the user is choosing
+    inputs. Any import error shows up again when the library is used.
+    '''
+
+    try:
+        warm_up()
+        hidden_imports()
+    except ImportError as error:
+        print('Warm up: ' + str(error))
+
+
 def main():
 
     global sdb
     sdb = SDBWidget()
     sdb.show()
 
+    # Daemon thread, so closing SDB GUI never waits for the imports
+    threading.Thread(target=background_imports, daemon=True).start()
+
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
@@ -0,0 +1,37 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sdb_core import nan_median_filter
+
+
+@pytest.mark.parametrize('size', [3, 4, 5, 6])
+def test_nan_median_filter_matches_scipy_away_from_nan(size):
+    from scipy import ndimage
+
+    rng = np.random.default_rng(0)
+    halo = size // 2
+    padded = np.pad(rng.random((16, 17)), halo, mode='reflect')
+    expected = ndimage.median_filter(padded, size=size)[halo:-halo, halo:-halo]
+
+    padded[0, 0] = np.nan
+    z_filtered = nan_median_filter(padded, size)
+
+    assert z_filtered.shape == (16, 17)
+    np.testing.assert_allclose(z_filtered[size:, size:], expected[size:, size:])
+
+
+@pytest.mark.parametrize('size', [3, 4])
+def test_nan_median_filter_keeps_no_data(size):
+    halo = size // 2
+    z_array = np.ones((16, 16))
+    z_array[5, 7] = np.nan
+    z_filtered = nan_median_filter(np.pad(z_array, halo, mode='reflect'), size)
+
+    assert z_filtered.shape == (16, 16)
+    assert np.isnan(z_filtered[5, 7])
+    assert np.isnan(z_filtered).sum() == 1
+    assert (z_filtered[~np.isnan(z_filtered)] == 1).all()